@@ -32,22 +32,33 @@ class Config:
     storage_extracted_dir: str = "extracted"
     storage_temp_dir: str = "temp"
     storage_logs_dir: str = "logs"
+    worker_tmpdir: str | None = None  # Where downloads are staged for parsing (see get_worker_temp_dir)
 
     # Processing
     max_retry_attempts: int = 3
     retry_base_delay_seconds: float = 2.0
     retry_max_delay_seconds: float = 60.0
     batch_processing_timeout_seconds: int = 1800
+    worker_concurrency: int = 2  # Jobs handled in parallel per queue worker process
+    stuck_finalize_concurrency: int = 4  # Stuck batches finalized in parallel per check
+    finalize_debounce_seconds: float = 2.0  # Min interval between per-file finalize checks (0 disables)
 
     # LLM (Phase 4)
     openai_api_key: str | None = None
     openai_model: str = "gpt-4o"  # Using GPT-4o for better quality extraction
     openai_max_tokens: int = 16384  # Increased for comprehensive extraction
+    openai_context_window: int = 128000  # Input + output token limit of the model
     openai_rate_limit_rpm: int = 60
 
+    # LLM result cache (keyed by file content hash)
+    llm_cache_enabled: bool = False
+    llm_cache_ttl_seconds: int = 604800
+
     # OCR configuration
     enable_ocr: bool = True
     ocr_max_pages: int = 50
+    ocr_max_workers: int = 4  # Pages OCR'd in parallel
+    ocr_dpi: int = 200  # Sufficient for typical scans, much faster than 300
     
     # GAEB configuration
     gaeb_enabled: bool = True
@@ -105,6 +116,27 @@ class Config:
         if self.batch_processing_timeout_seconds < 60:
             raise ValueError("BATCH_PROCESSING_TIMEOUT must be >= 60 seconds")
 
+        if self.worker_concurrency < 1 or self.worker_concurrency > 16:
+            raise ValueError("WORKER_CONCURRENCY must be between 1 and 16")
+
+        if self.stuck_finalize_concurrency < 1:
+            raise ValueError("STUCK_FINALIZE_CONCURRENCY must be at least 1")
+
+        if self.finalize_debounce_seconds < 0:
+            raise ValueError("FINALIZE_DEBOUNCE_SECONDS must be non-negative")
+
+        if self.openai_context_window <= self.openai_max_tokens:
+            raise ValueError("OPENAI_CONTEXT_WINDOW must be greater than OPENAI_MAX_TOKENS")
+
+        if self.ocr_max_workers < 1:
+            raise ValueError("OCR_MAX_WORKERS must be >= 1")
+
+        if self.ocr_dpi < 72 or self.ocr_dpi > 600:
+            raise ValueError("OCR_DPI must be between 72 and 600")
+
+        if self.llm_cache_ttl_seconds < 1:
+            raise ValueError("LLM_CACHE_TTL_SECONDS must be >= 1")
+
         if self.log_level not in {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}:
             raise ValueError("LOG_LEVEL must be DEBUG, INFO, WARNING, ERROR, or CRITICAL")
 
@@ -146,6 +178,14 @@ class Config:
     def get_temp_path(self) -> str:
         return self.get_storage_path(self.storage_temp_dir)
 
+    def get_worker_temp_dir(self) -> str | None:
+        if self.worker_tmpdir:
+            return self.worker_tmpdir
+        # Same filesystem as local storage, so downloads can be hard links
+        if self.storage_backend == "local":
+            return self.get_temp_path()
+        return None  # System temp dir
+
     def get_logs_path(self) -> str:
         return self.get_storage_path(self.storage_logs_dir)
 
@@ -189,17 +229,26 @@ def load_config() -> Config:
         storage_uploads_dir=os.environ.get("STORAGE_UPLOADS_DIR", "uploads"),
         storage_extracted_dir=os.environ.get("STORAGE_EXTRACTED_DIR", "extracted"),
         storage_temp_dir=os.environ.get("STORAGE_TEMP_DIR", "temp"),
+        worker_tmpdir=os.environ.get("WORKER_TMPDIR") or None,
         storage_logs_dir=os.environ.get("STORAGE_LOGS_DIR", "logs"),
         max_retry_attempts=int(os.environ.get("MAX_RETRY_ATTEMPTS", "3")),
         retry_base_delay_seconds=float(os.environ.get("RETRY_BASE_DELAY_SECONDS", "2.0")),
         retry_max_delay_seconds=float(os.environ.get("RETRY_MAX_DELAY_SECONDS", "60.0")),
         batch_processing_timeout_seconds=int(os.environ.get("BATCH_PROCESSING_TIMEOUT", "1800")),
+        worker_concurrency=int(os.environ.get("WORKER_CONCURRENCY", "2")),
+        stuck_finalize_concurrency=int(os.environ.get("STUCK_FINALIZE_CONCURRENCY", "4")),
+        finalize_debounce_seconds=float(os.environ.get("FINALIZE_DEBOUNCE_SECONDS", "2.0")),
         openai_api_key=os.environ.get("OPENAI_API_KEY"),
         openai_model=os.environ.get("OPENAI_MODEL", "gpt-4o"),  # GPT-4o for best quality
         openai_max_tokens=int(os.environ.get("OPENAI_MAX_TOKENS", "16384")),  # Increased capacity
+        openai_context_window=int(os.environ.get("OPENAI_CONTEXT_WINDOW", "128000")),
         openai_rate_limit_rpm=int(os.environ.get("OPENAI_RATE_LIMIT_RPM", "60")),
+        llm_cache_enabled=os.environ.get("LLM_CACHE_ENABLED", "false").lower() in ("true", "1", "yes"),
+        llm_cache_ttl_seconds=int(os.environ.get("LLM_CACHE_TTL_SECONDS", "604800")),
         enable_ocr=os.environ.get("ENABLE_OCR", "true").lower() in ("true", "1", "yes"),
         ocr_max_pages=int(os.environ.get("OCR_MAX_PAGES", "50")),
+        ocr_max_workers=int(os.environ.get("OCR_MAX_WORKERS", "4")),
+        ocr_dpi=int(os.environ.get("OCR_DPI", "200")),
         gaeb_enabled=os.environ.get("GAEB_ENABLED", "true").lower() in ("true", "1", "yes"),
         redis_url=os.environ.get("REDIS_URL", "redis://localhost:6379"),
         redis_queue_key=os.environ.get("REDIS_QUEUE_KEY", "tender:jobs"),
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import re
+
 
 class WorkerError(Exception):
     error_type = "UNKNOWN"
@@ -29,28 +31,36 @@ class LLMError(WorkerError):
     error_type = "LLM_ERROR"
 
 
+# Message keywords per error type, in priority order (first matching type wins)
+_MESSAGE_KEYWORDS = (
+    ("RATE_LIMIT", ("rate limit", "429")),
+    ("TIMEOUT", ("timeout", "timed out")),
+    ("PARSE_ERROR", ("parse", "decode")),
+    ("LLM_ERROR", ("openai", "llm")),
+    ("PERMANENT", ("permission", "not found")),
+    ("RETRYABLE", ("connection", "network")),
+)
+_MESSAGE_PRIORITY = {error_type: rank for rank, (error_type, _) in enumerate(_MESSAGE_KEYWORDS)}
+# One alternation with a named group per type: a single scan finds every keyword
+_MESSAGE_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{error_type}>{'|'.join(re.escape(keyword) for keyword in keywords)})"
+        for error_type, keywords in _MESSAGE_KEYWORDS
+    ),
+    re.IGNORECASE,
+)
+
+
 def classify_error(error: Exception) -> str:
     if hasattr(error, "error_type"):
         return getattr(error, "error_type")
 
-    message = str(error).lower()
-
-    if "rate limit" in message or "429" in message:
-        return "RATE_LIMIT"
-
-    if "timeout" in message or "timed out" in message:
-        return "TIMEOUT"
-
-    if "parse" in message or "decode" in message:
-        return "PARSE_ERROR"
-
-    if "openai" in message or "llm" in message:
-        return "LLM_ERROR"
-
-    if "permission" in message or "not found" in message:
-        return "PERMANENT"
-
-    if "connection" in message or "network" in message:
-        return "RETRYABLE"
+    best = None
+    for match in _MESSAGE_PATTERN.finditer(str(error)):
+        error_type = match.lastgroup
+        if best is None or _MESSAGE_PRIORITY[error_type] < _MESSAGE_PRIORITY[best]:
+            best = error_type
+            if _MESSAGE_PRIORITY[best] == 0:
+                break
 
-    return "UNKNOWN"
+    return best or "UNKNOWN"
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 from contextlib import contextmanager
+from contextvars import ContextVar
 from logging.handlers import RotatingFileHandler
-from typing import Iterator
+from typing import Callable, Iterator
 
 from workers.config import Config
 
@@ -36,7 +38,17 @@ class TextFormatter(logging.Formatter):
         return " | ".join(parts)
 
 
+# Jobs run on a thread pool, so two threads may set up the same logger at once
+_SETUP_LOCK = threading.Lock()
+
+
 def setup_logger(name: str, config: Config) -> logging.Logger:
+    with _SETUP_LOCK:
+        _install_context_record_factory()
+        return _setup_logger(name, config)
+
+
+def _setup_logger(name: str, config: Config) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(config.log_level)
     logger.propagate = False
@@ -64,18 +76,31 @@ def setup_logger(name: str, config: Config) -> logging.Logger:
     return logger
 
 
-@contextmanager
-def log_context(logger: logging.Logger, **context) -> Iterator[logging.Logger]:
-    old_factory = logging.getLogRecordFactory()
+# Per-thread/task record attributes set by log_context. A ContextVar keeps
+# concurrent jobs (see queue_worker) from leaking doc_id/batch_id into each other.
+_LOG_CONTEXT: ContextVar[dict] = ContextVar("log_context", default={})
+_base_record_factory: Callable[..., logging.LogRecord] | None = None
 
-    def record_factory(*args, **kwargs):
-        record = old_factory(*args, **kwargs)
-        for key, value in context.items():
-            setattr(record, key, value)
-        return record
 
-    logging.setLogRecordFactory(record_factory)
+def _context_record_factory(*args, **kwargs) -> logging.LogRecord:
+    record = _base_record_factory(*args, **kwargs)
+    for key, value in _LOG_CONTEXT.get().items():
+        setattr(record, key, value)
+    return record
+
+
+def _install_context_record_factory() -> None:
+    # Called from setup_logger (under its lock) rather than at import time
+    global _base_record_factory
+    if _base_record_factory is None:
+        _base_record_factory = logging.getLogRecordFactory()
+        logging.setLogRecordFactory(_context_record_factory)
+
+
+@contextmanager
+def log_context(logger: logging.Logger, **context) -> Iterator[logging.Logger]:
+    token = _LOG_CONTEXT.set({**_LOG_CONTEXT.get(), **context})
     try:
         yield logger
     finally:
-        logging.setLogRecordFactory(old_factory)
+        _LOG_CONTEXT.reset(token)
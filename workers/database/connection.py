@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from contextlib import contextmanager
 from typing import Iterator
 
@@ -11,6 +12,8 @@ from workers.config import Config
 
 _ENGINE: Engine | None = None
 _SESSION_FACTORY: sessionmaker | None = None
+# Guards lazy creation of the singletons above when jobs run on worker threads
+_INIT_LOCK = threading.RLock()
 
 
 def _normalize_database_url(database_url: str) -> str:
@@ -24,25 +27,29 @@ def _normalize_database_url(database_url: str) -> str:
 def get_engine(config: Config) -> Engine:
     global _ENGINE
     if _ENGINE is None:
-        _ENGINE = create_engine(
-            _normalize_database_url(config.database_url),
-            pool_size=config.database_max_connections,
-            pool_pre_ping=True,
-            pool_timeout=config.database_timeout_seconds,
-            future=True,
-        )
+        with _INIT_LOCK:
+            if _ENGINE is None:
+                _ENGINE = create_engine(
+                    _normalize_database_url(config.database_url),
+                    pool_size=config.database_max_connections,
+                    pool_pre_ping=True,
+                    pool_timeout=config.database_timeout_seconds,
+                    future=True,
+                )
     return _ENGINE
 
 
 def get_session_factory(config: Config) -> sessionmaker:
     global _SESSION_FACTORY
     if _SESSION_FACTORY is None:
-        _SESSION_FACTORY = sessionmaker(
-            bind=get_engine(config),
-            autocommit=False,
-            autoflush=False,
-            expire_on_commit=False,
-        )
+        with _INIT_LOCK:
+            if _SESSION_FACTORY is None:
+                _SESSION_FACTORY = sessionmaker(
+                    bind=get_engine(config),
+                    autocommit=False,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
     return _SESSION_FACTORY
 
 
@@ -2,13 +2,26 @@ from __future__ import annotations
 
 from typing import Iterable, Tuple
 
-from sqlalchemy import case, func
+from sqlalchemy import case, column, func, table
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from workers.database.models import FileExtraction, ProcessingJob, RunSummary
 
+_BATCH_STATUS_SUMMARY = table(
+    "batch_status_summary",
+    column("batch_id"),
+    column("total_files"),
+    column("files_tracked"),
+    column("files_success"),
+    column("files_failed"),
+    column("files_processing"),
+    column("files_pending"),
+    column("progress_percent"),
+    column("batch_status"),
+)
+
 
 def get_batch_by_id(session: Session, batch_id: str) -> ProcessingJob | None:
     return (
@@ -386,6 +399,25 @@ def get_batch_status_summary(session: Session, batch_id: str) -> dict | None:
     return dict(result) if result else None
 
 
+def get_finalize_context(session: Session, batch_id: str) -> tuple[ProcessingJob | None, dict | None]:
+    """Load the batch job and its status summary (if any) in a single query."""
+    summary = _BATCH_STATUS_SUMMARY.c
+    row = (
+        session.query(ProcessingJob, *(col.label(f"summary_{col.name}") for col in summary))
+        .outerjoin(_BATCH_STATUS_SUMMARY, summary.batch_id == ProcessingJob.batch_id)
+        .filter(ProcessingJob.batch_id == batch_id)
+        .one_or_none()
+    )
+    if row is None:
+        return None, None
+    mapping = row._mapping
+    if mapping["summary_batch_id"] is None:
+        return mapping[ProcessingJob], None
+    return mapping[ProcessingJob], {
+        col.name: mapping[f"summary_{col.name}"] for col in summary if col.name != "batch_id"
+    }
+
+
 def create_or_update_run_summary(
     session: Session,
     run_id: str,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from typing import Any
 
 from sqlalchemy.orm import Session
@@ -8,14 +9,15 @@ from workers.config import Config
 from workers.database import operations
 from workers.database.models import FileExtraction, RunSummary
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
 
 def _normalize_text(text: str) -> str:
     """Normalize text for deduplication (lowercase, strip, collapse whitespace)"""
-    import re
     if not text:
         return ""
     text = text.lower().strip()
-    text = re.sub(r'\s+', ' ', text)  # Collapse multiple spaces
+    text = _WHITESPACE_RE.sub(' ', text)  # Collapse multiple spaces
     return text
 
 
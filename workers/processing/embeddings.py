@@ -10,6 +10,10 @@ from openai import OpenAI
 
 from workers.config import Config
 
+_PARAGRAPH_RE = re.compile(r"§\s*\d+[a-zA-Z]*")
+_PROCUREMENT_LAW_RE = re.compile(r"\b(vob/a|vob/b|uvg|gwb)\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 def normalize(text: str) -> str:
     """Normalize text for comparison: lowercase, remove accents, clean legal terms."""
@@ -18,10 +22,10 @@ def normalize(text: str) -> str:
     text = text.encode("ascii", "ignore").decode("ascii")
 
     # German legal cleanup
-    text = re.sub(r"§\s*\d+[a-zA-Z]*", " paragraph ", text)
-    text = re.sub(r"\b(vob/a|vob/b|uvg|gwb)\b", " vergaberecht ", text)
+    text = _PARAGRAPH_RE.sub(" paragraph ", text)
+    text = _PROCUREMENT_LAW_RE.sub(" vergaberecht ", text)
 
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
     return text
 
 
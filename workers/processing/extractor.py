@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Any
 
 from sqlalchemy.orm import Session
@@ -9,10 +10,25 @@ from workers.core.errors import classify_error
 from workers.core.logging import log_context, setup_logger
 from workers.database import operations
 from workers.processing.chunking import chunk_text
-from workers.processing.llm_client import extract_tender_data, extract_critical_fields
+from workers.processing.llm_cache import CacheHit, LLMCache
+from workers.processing.llm_client import (
+    PROMPT_VERSION,
+    extract_critical_fields,
+    extract_tender_data_dedup,
+    rewrite_source_document,
+)
 from workers.processing.embeddings import select_relevant_chunks
 from workers.processing.parsers import parse_file
-from workers.utils.filesystem import resolve_storage_path
+from workers.utils.filesystem import compute_file_sha256, resolve_storage_path
+
+
+@dataclass(frozen=True)
+class ProcessResult:
+    """Outcome of process_file, so callers need not re-fetch the file row."""
+
+    doc_id: str
+    status: str
+    run_id: str | None
 
 
 def merge_extractions(chunks_data: list[dict[str, Any]]) -> dict[str, Any]:
@@ -74,7 +90,7 @@ def _merge_with_priority(semantic_data: dict[str, Any], critical_data: dict[str,
 
 
 
-def process_file(session: Session, doc_id: str, config: Config) -> None:
+def process_file(session: Session, doc_id: str, config: Config) -> ProcessResult:
     logger = setup_logger("worker.extractor", config)
 
     with log_context(logger, doc_id=doc_id):
@@ -93,8 +109,12 @@ def process_file(session: Session, doc_id: str, config: Config) -> None:
             storage = config.create_storage_adapter()
             
             # Import temp file manager
+            from workers.storage.adapter import ObjectKey
             from workers.storage.temp_file_manager import TempFileManager
-            temp_manager = TempFileManager(storage)
+            temp_manager = TempFileManager(storage, temp_dir=config.get_worker_temp_dir())
+
+            llm_cache = LLMCache.from_config(config, PROMPT_VERSION) if config.llm_cache_enabled else None
+            content_hash: str | None = None
             
             object_key = file_extraction.file_path
             logger.info(f"Processing file from storage: {object_key} (type: {file_extraction.file_type})")
@@ -103,16 +123,34 @@ def process_file(session: Session, doc_id: str, config: Config) -> None:
             file_extension = temp_manager.get_file_extension(object_key)
             
             # Download to temp file and parse
-            with temp_manager.download_to_temp(object_key, suffix=file_extension) as temp_path:
+            with temp_manager.download_to_temp(ObjectKey(object_key), suffix=file_extension) as temp_path:
                 logger.info(f"Downloaded to temp file: {temp_path}")
+
+                if llm_cache is not None:
+                    content_hash = compute_file_sha256(temp_path)
                 
                 # Parse file with OCR support for scanned PDFs
-                raw_text = parse_file(
-                    file_path=object_key,  # For type detection
-                    temp_file_path=temp_path,  # Actual file to parse
-                    enable_ocr=config.enable_ocr,
-                    ocr_max_pages=config.ocr_max_pages
-                )
+                try:
+                    raw_text = parse_file(
+                        file_path=object_key,  # For type detection
+                        temp_file_path=temp_path,  # Actual file to parse
+                        enable_ocr=config.enable_ocr,
+                        ocr_max_pages=config.ocr_max_pages,
+                        ocr_max_workers=config.ocr_max_workers,
+                        ocr_dpi=config.ocr_dpi,
+                        enable_gaeb=config.gaeb_enabled,
+                        llm_cache=llm_cache,
+                        content_hash=content_hash,
+                    )
+                except CacheHit as hit:
+                    # Identical bytes were already extracted - skip parsing and both LLM stages
+                    logger.info(f"LLM cache hit for {object_key} (sha256={hit.content_hash[:12]})")
+                    cached_extraction = rewrite_source_document(
+                        hit.extraction, file_extraction.filename or "document"
+                    )
+                    file_row = operations.mark_file_success(session, doc_id, cached_extraction)
+                    logger.info(f"Successfully processed {doc_id} (cached)")
+                    return ProcessResult(doc_id, file_row.status, file_row.run_id)
                 logger.info(f"Parsed {len(raw_text)} characters from {object_key}")
             
             # Temp file is automatically deleted after context manager exits
@@ -155,10 +193,10 @@ def process_file(session: Session, doc_id: str, config: Config) -> None:
             # STAGE 2: Extract remaining fields with SEMANTIC logic
             # All other fields (risks, requirements, etc.)
             logger.info(f"[Stage 2] Extracting remaining fields with semantic logic from {len(chunks_for_llm)} chunks...")
-            semantic_results = [
-                extract_tender_data(chunk, config, source_filename)
-                for chunk in chunks_for_llm
-            ]
+            semantic_results = extract_tender_data_dedup(
+                [(chunk, source_filename) for chunk in chunks_for_llm],
+                config,
+            )
             semantic_merged = merge_extractions(semantic_results)
             logger.info(f"[Stage 2] Semantic fields extracted")
             
@@ -167,11 +205,15 @@ def process_file(session: Session, doc_id: str, config: Config) -> None:
             final_extraction = _merge_with_priority(semantic_merged, critical_merged)
             logger.info("[Stage 3] Merge complete")
 
-            operations.mark_file_success(session, doc_id, final_extraction)
+            file_row = operations.mark_file_success(session, doc_id, final_extraction)
+            if llm_cache is not None and content_hash:
+                llm_cache.set(content_hash, final_extraction)
             logger.info(f"Successfully processed {doc_id}")
+            return ProcessResult(doc_id, file_row.status, file_row.run_id)
         except Exception as exc:  # noqa: BLE001 - centralize error handling
             logger.error(f"Failed to process {doc_id}: {exc}")
             error_type = classify_error(exc)
-            operations.mark_file_failed(session, doc_id, str(exc), error_type)
+            file_row = operations.mark_file_failed(session, doc_id, str(exc), error_type)
             # Don't re-raise - let the endpoint return success after committing the failure
             # The orchestrator will see the FAILED status and count it appropriately
+            return ProcessResult(doc_id, file_row.status, file_row.run_id)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from redis import Redis, RedisError
+
+from workers.config import Config
+
+
+@lru_cache(maxsize=None)
+def _get_redis_client(redis_url: str) -> Redis:
+    # One connection pool per URL for the whole process; clients are thread-safe
+    return Redis.from_url(redis_url, decode_responses=True)
+
+
+class CacheHit(Exception):
+    """Raised by parse_file when a cached extraction exists for the file bytes."""
+
+    def __init__(self, content_hash: str, extraction: dict[str, Any]):
+        super().__init__(content_hash)
+        self.content_hash = content_hash
+        self.extraction = extraction
+
+
+class LLMCache:
+    """
+    Redis-backed cache of final extraction results.
+
+    Entries are keyed by the SHA-256 of the raw file bytes plus the model and
+    prompt version, so a prompt change never serves stale results. All Redis
+    failures are treated as cache misses - the cache must never fail a file.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        model: str,
+        prompt_version: str,
+        ttl_seconds: int,
+        key_prefix: str = "tender:llm_cache",
+    ):
+        self.redis_client = redis_client
+        self.model = model
+        self.prompt_version = prompt_version
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_config(cls, config: Config, prompt_version: str) -> "LLMCache":
+        return cls(
+            redis_client=_get_redis_client(config.redis_url),
+            model=config.openai_model,
+            prompt_version=prompt_version,
+            ttl_seconds=config.llm_cache_ttl_seconds,
+        )
+
+    def _key(self, content_hash: str) -> str:
+        return f"{self.key_prefix}:{self.model}:{self.prompt_version}:{content_hash}"
+
+    def get(self, content_hash: str) -> dict[str, Any] | None:
+        try:
+            raw = self.redis_client.get(self._key(content_hash))
+        except RedisError:
+            return None
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+    def set(self, content_hash: str, extraction: dict[str, Any]) -> None:
+        try:
+            self.redis_client.set(
+                self._key(content_hash),
+                json.dumps(extraction, ensure_ascii=False),
+                ex=self.ttl_seconds,
+            )
+        except RedisError:
+            pass
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
-import re
+from functools import lru_cache
 from typing import Any
 
 from openai import OpenAI
@@ -10,6 +12,76 @@ from workers.config import Config
 from workers.core.errors import LLMError, RateLimitError, RetryableError, TimeoutError
 from workers.core.retry import RetryConfig, retry_with_backoff
 
+# tiktoken is optional - without it token counts are estimated from characters
+_TIKTOKEN_AVAILABLE = False
+try:
+    import tiktoken
+    _TIKTOKEN_AVAILABLE = True
+except ImportError:
+    pass
+
+# orjson is optional - stdlib json is used when it is not installed
+_ORJSON_AVAILABLE = False
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+# Bump whenever the extraction prompts change so cached results are not reused
+PROMPT_VERSION = "1"
+
+# Upper bound for the fixed instructions/JSON schema wrapped around the document text
+_STATIC_PROMPT_TOKENS = 4000
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    if not _TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass  # Unknown model name - use the current default encoding
+    except Exception:  # noqa: BLE001 - encoding files may not be downloadable
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def _truncate_to_token_budget(text: str, model: str, budget: int) -> str:
+    """
+    Fit text into budget tokens, keeping the head and the tail.
+
+    Tender documents carry their metadata at the start and deadlines/pricing
+    at the end, so the middle is the cheapest part to drop.
+    """
+    budget = max(budget, 1)
+    # A token is at least one byte, so short texts never need encoding
+    if len(text.encode("utf-8")) <= budget:
+        return text
+
+    encoding = _get_encoding(model)
+    if encoding is None:
+        max_chars = budget * 4  # Same estimate as chunking.estimate_token_count
+        if len(text) <= max_chars:
+            return text
+        half = max_chars // 2
+        return text[:half] + "\n...\n" + text[-half:]
+
+    tokens = encoding.encode(text)
+    if len(tokens) <= budget:
+        return text
+    half = budget // 2
+    return encoding.decode(tokens[:half]) + "\n...\n" + encoding.decode(tokens[-half:])
+
+
+def _fit_to_context(text: str, config: Config, max_output_tokens: int) -> str:
+    budget = config.openai_context_window - _STATIC_PROMPT_TOKENS - max_output_tokens
+    return _truncate_to_token_budget(text, config.openai_model, budget)
+
 
 def _build_critical_fields_prompt(text: str, source_filename: str = "document") -> str:
     """
@@ -209,14 +281,37 @@ def _build_extraction_prompt(text: str, source_filename: str = "document") -> st
     )
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _parse_llm_response(response: str) -> dict:
     try:
-        return json.loads(response)
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(response) if _ORJSON_AVAILABLE else json.loads(response)
     except json.JSONDecodeError:
-        match = re.search(r"\{.*\}", response, re.DOTALL)
-        if match:
-            return json.loads(match.group(0))
-        raise LLMError("Invalid JSON returned by LLM")
+        # Model wrapped the JSON in prose/markdown: decode the first object only
+        start = response.find("{")
+        if start < 0:
+            raise LLMError("Invalid JSON returned by LLM")
+        try:
+            data, _ = _JSON_DECODER.raw_decode(response, start)
+        except json.JSONDecodeError as exc:
+            raise LLMError("Invalid JSON returned by LLM") from exc
+        return data
+
+
+def rewrite_source_document(data: Any, source_filename: str) -> Any:
+    """Recursively set every 'source_document' field to source_filename (in place)."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "source_document":
+                data[key] = source_filename
+            else:
+                rewrite_source_document(value, source_filename)
+    elif isinstance(data, list):
+        for item in data:
+            rewrite_source_document(item, source_filename)
+    return data
 
 
 def _map_openai_error(error: Exception) -> Exception:
@@ -247,6 +342,7 @@ def extract_critical_fields(text: str, config: Config, source_filename: str = "d
             ) from exc
         raise
     
+    text = _fit_to_context(text, config, max_output_tokens=500)
     prompt = _build_critical_fields_prompt(text, source_filename)
     
     retry_config = RetryConfig(
@@ -301,6 +397,7 @@ def extract_tender_data(text: str, config: Config, source_filename: str = "docum
             ) from exc
         raise
     
+    text = _fit_to_context(text, config, max_output_tokens=config.openai_max_tokens)
     prompt = _build_extraction_prompt(text, source_filename)
 
     retry_config = RetryConfig(
@@ -341,4 +438,26 @@ def extract_tender_data(text: str, config: Config, source_filename: str = "docum
     return _parse_llm_response(raw)
 
 
+def extract_tender_data_dedup(items: list[tuple[str, str]], config: Config) -> list[dict[str, Any]]:
+    """
+    Run extract_tender_data once per distinct text.
+
+    items are (text, source_filename) pairs. Texts with identical content
+    (boilerplate such as AGB appearing under several filenames) share one
+    LLM call; the copies get their source_document fields rewritten to
+    their own filename. Results are returned in input order.
+    """
+    groups: dict[str, list[int]] = {}
+    for index, (text, _) in enumerate(items):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        groups.setdefault(digest, []).append(index)
 
+    results: list[dict[str, Any]] = [{} for _ in items]
+    for indices in groups.values():
+        first = indices[0]
+        text, source_filename = items[first]
+        extraction = extract_tender_data(text, config, source_filename)
+        results[first] = extraction
+        for index in indices[1:]:
+            results[index] = rewrite_source_document(copy.deepcopy(extraction), items[index][1])
+    return results
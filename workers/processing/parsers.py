@@ -1,15 +1,44 @@
 from __future__ import annotations
 
 import csv
+import io
+import logging
+import mmap
 import os
-from typing import Iterable
+import threading
+import xml.sax
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
 
 import PyPDF2
 from docx import Document
 from openpyxl import load_workbook
 
 from workers.core.errors import ParseError, PermanentError
-from workers.utils.filesystem import get_file_type
+from workers.processing.llm_cache import CacheHit, LLMCache
+from workers.utils.filesystem import compute_file_sha256, get_file_type
+
+# PDFium text extraction (optional - falls back to pure-Python PyPDF2)
+_PDFIUM_AVAILABLE = False
+try:
+    import pypdfium2 as pdfium
+    _PDFIUM_AVAILABLE = True
+except ImportError:
+    pass
+
+# PDFium is not thread-safe even across separate documents, and jobs run on a
+# thread pool (see queue_worker), so every PDFium call happens under this lock
+_PDFIUM_LOCK = threading.Lock()
+
+# Arrow CSV reader (optional - falls back to the stdlib csv module)
+_PYARROW_AVAILABLE = False
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    pass
 
 # OCR imports (optional - only if ENABLE_OCR=true)
 _OCR_AVAILABLE = False
@@ -21,14 +50,26 @@ try:
 except ImportError:
     pass
 
-# GAEB imports (optional - only if GAEB_ENABLED=true)
-# DISABLED FOR PRODUCTION - Python 3.13 compatibility issues
-_GAEB_AVAILABLE = False
-# try:
-#     from lxml import etree
-#     _GAEB_AVAILABLE = True
-# except ImportError:
-#     pass
+# GAEB files are read with the stdlib SAX parser (see parse_gaeb); lxml stays
+# disabled for production because of Python 3.13 compatibility issues
+
+
+# Child of the extractor logger, so records reach its configured handlers
+logger = logging.getLogger("worker.extractor.parsers")
+
+OCR_PAGE_BREAK = "\n\n=== PAGE BREAK ===\n\n"
+
+# CSVs smaller than this are parsed with the stdlib csv module
+_ARROW_CSV_MIN_BYTES = 1 << 20
+
+# A page with less text than this is considered scanned (image-only)
+_OCR_MIN_PAGE_CHARS = 50
+# If this many leading pages are all scanned, skip text extraction for OCR'd pages
+_OCR_SAMPLE_PAGES = 5
+# OCR kicks in only when more than this share of pages is scanned
+_OCR_SPARSE_PAGE_RATIO = 0.5
+# Pages rendered per convert_from_path call (~25 MB per page image at 300 DPI)
+_OCR_BATCH_PAGES = 8
 
 
 def _ocr_pdf_page(image) -> str:
@@ -41,38 +82,166 @@ def _ocr_pdf_page(image) -> str:
         return ""
 
 
-def parse_pdf(file_path: str, enable_ocr: bool = False, ocr_max_pages: int = 50) -> str:
-    """Parse PDF with optional OCR fallback for scanned documents."""
+def _page_runs(page_indices: list[int], max_run_length: int) -> list[tuple[int, int]]:
+    """Group sorted 0-based page indices into 1-based inclusive (first, last) runs."""
+    runs: list[list[int]] = []
+    for index in page_indices:
+        page_number = index + 1
+        if (
+            runs
+            and runs[-1][1] == page_number - 1
+            and runs[-1][1] - runs[-1][0] + 1 < max_run_length
+        ):
+            runs[-1][1] = page_number
+        else:
+            runs.append([page_number, page_number])
+    return [(first, last) for first, last in runs]
+
+
+def _pdfium_page_text(pdf: "pdfium.PdfDocument", index: int) -> str:
+    page = pdf[index]
+    try:
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n")
+        finally:
+            textpage.close()
+    finally:
+        page.close()
+
+
+@contextmanager
+def _open_pdf_text(file_path: str) -> Iterator[tuple[int, Callable[[int], str]]]:
+    """Open a PDF for text extraction, yielding its page count and a per-page extractor."""
+    if _PDFIUM_AVAILABLE:
+        # Held from open to close; keep the block short (no OCR inside it)
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                yield len(pdf), lambda index: _pdfium_page_text(pdf, index)
+            finally:
+                pdf.close()
+        return
+
+    # Map the file so PyPDF2's many seeks and small reads hit the page cache
+    # directly instead of going through a buffered copy of the document
+    with open(file_path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        reader = PyPDF2.PdfReader(mapped)
+        yield len(reader.pages), lambda index: reader.pages[index].extract_text() or ""
+
+
+def _extract_page_texts(
+    page_count: int,
+    extract_page: Callable[[int], str],
+    ocr_enabled: bool,
+    ocr_max_pages: int,
+) -> tuple[list[str], list[int]]:
+    """
+    Extract the text layer page by page.
+
+    When the first _OCR_SAMPLE_PAGES pages carry no text the document is
+    assumed scanned, and pages that will be OCR'd anyway are not extracted.
+    Returns the page texts and the indices of the skipped pages.
+    """
+    page_texts: list[str] = []
+    skipped_pages: list[int] = []
+    assume_scanned = False
+    for index in range(page_count):
+        if assume_scanned and index < ocr_max_pages:
+            page_texts.append("")
+            skipped_pages.append(index)
+            continue
+        page_texts.append(extract_page(index))
+        if (
+            ocr_enabled
+            and index + 1 == _OCR_SAMPLE_PAGES
+            and all(len(page_text.strip()) < _OCR_MIN_PAGE_CHARS for page_text in page_texts)
+        ):
+            assume_scanned = True
+    return page_texts, skipped_pages
+
+
+def _ocr_sparse_pages(
+    file_path: str,
+    page_texts: list[str],
+    ocr_max_pages: int,
+    ocr_max_workers: int | None,
+    ocr_dpi: int,
+) -> str | None:
+    """OCR the pages without text; returns None when OCR is not needed or yields nothing."""
+    # Treat the PDF as scanned when most pages have (almost) no text layer
+    sparse_pages = [
+        index for index, page_text in enumerate(page_texts)
+        if len(page_text.strip()) < _OCR_MIN_PAGE_CHARS
+    ]
+    if len(sparse_pages) / len(page_texts) <= _OCR_SPARSE_PAGE_RATIO:
+        return None
+
+    # Only OCR pages without usable text, limited to prevent runaway jobs
+    pages_to_ocr = sparse_pages[:ocr_max_pages]
+    logger.info(
+        "[Parser] PDF appears scanned (%d/%d pages without text), running OCR on %d pages...",
+        len(sparse_pages),
+        len(page_texts),
+        len(pages_to_ocr),
+    )
+
+    try:
+        stitched = list(page_texts)
+        ocr_page_count = 0
+        # tesseract runs as a subprocess per page, so threads OCR pages in parallel
+        max_workers = max(1, min(ocr_max_workers or os.cpu_count() or 1, len(pages_to_ocr)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Render a few pages at a time so peak memory stays at one batch of images
+            for first_page, last_page in _page_runs(pages_to_ocr, _OCR_BATCH_PAGES):
+                images = convert_from_path(file_path, dpi=ocr_dpi, first_page=first_page, last_page=last_page)
+                ocr_texts = list(executor.map(_ocr_pdf_page, images))  # Preserves page order
+                del images
+                for page_number, ocr_text in zip(range(first_page, last_page + 1), ocr_texts):
+                    # Stitch OCR output back into its original page position
+                    if len(ocr_text.strip()) > len(stitched[page_number - 1].strip()):
+                        stitched[page_number - 1] = ocr_text
+                        ocr_page_count += 1
+
+        if ocr_page_count == 0:
+            logger.warning("[Parser] OCR failed to extract meaningful text")
+            return None
+
+        ocr_text = OCR_PAGE_BREAK.join(stitched)
+        logger.info("[Parser] OCR successful: %d chars, %d pages recognized", len(ocr_text), ocr_page_count)
+        return ocr_text
+    except Exception as ocr_exc:  # noqa: BLE001
+        logger.warning("[Parser] OCR failed: %s", ocr_exc)
+        return None
+
+
+def parse_pdf(
+    file_path: str,
+    enable_ocr: bool = False,
+    ocr_max_pages: int = 50,
+    ocr_max_workers: int | None = None,
+    ocr_dpi: int = 200,
+) -> str:
+    """Parse PDF with optional OCR fallback for scanned pages."""
     try:
-        with open(file_path, "rb") as handle:
-            reader = PyPDF2.PdfReader(handle)
-            text_content = "\n".join(page.extract_text() or "" for page in reader.pages)
-            
-            # Check if PDF is scanned (no/minimal text)
-            if enable_ocr and _OCR_AVAILABLE and len(text_content.strip()) < 100:
-                print(f"[Parser] PDF appears scanned ({len(text_content)} chars), running OCR...")
-                
-                # Limit pages for OCR to prevent runaway jobs
-                num_pages = len(reader.pages)
-                pages_to_ocr = min(num_pages, ocr_max_pages)
-                
-                try:
-                    # Convert PDF to images and OCR
-                    images = convert_from_path(file_path, dpi=300, first_page=1, last_page=pages_to_ocr)
-                    ocr_chunks = [_ocr_pdf_page(img) for img in images]
-                    ocr_text = "\n\n=== PAGE BREAK ===\n\n".join(ocr_chunks)
-                    
-                    if len(ocr_text.strip()) > 100:
-                        print(f"[Parser] OCR successful: {len(ocr_text)} chars from {pages_to_ocr} pages")
-                        return ocr_text
-                    else:
-                        print(f"[Parser] OCR failed to extract meaningful text")
-                        return text_content  # Return original (even if empty)
-                except Exception as ocr_exc:  # noqa: BLE001
-                    print(f"[Parser] OCR failed: {ocr_exc}")
-                    return text_content  # Fallback to original text
-            
-            return text_content
+        ocr_enabled = enable_ocr and _OCR_AVAILABLE
+        with _open_pdf_text(file_path) as (page_count, extract_page):
+            page_texts, skipped_pages = _extract_page_texts(
+                page_count, extract_page, ocr_enabled, ocr_max_pages
+            )
+
+        # OCR runs with the document closed, so it never holds the PDFium lock
+        if ocr_enabled and page_texts:
+            ocr_text = _ocr_sparse_pages(file_path, page_texts, ocr_max_pages, ocr_max_workers, ocr_dpi)
+            if ocr_text is not None:
+                return ocr_text
+
+        if skipped_pages:
+            # No OCR result after all - extract the pages that were skipped
+            with _open_pdf_text(file_path) as (_, extract_page):
+                for index in skipped_pages:
+                    page_texts[index] = extract_page(index)
+        return "\n".join(page_texts)
     except Exception as exc:  # noqa: BLE001 - return consistent error types
         raise ParseError(f"Failed to parse PDF: {file_path}") from exc
 
@@ -85,31 +254,78 @@ def parse_word(file_path: str) -> str:
         raise ParseError(f"Failed to parse Word document: {file_path}") from exc
 
 
+def _render_sheet(sheet) -> str:
+    chunks: list[str] = [f"## {sheet.title}"]
+    for row in sheet.iter_rows(values_only=True):
+        # Read-only sheets pad rows to the sheet width; skip blank rows before formatting
+        if row.count(None) + row.count("") == len(row):
+            continue
+        row_text = " | ".join(["" if value is None else str(value) for value in row])
+        if row_text.strip():
+            chunks.append(row_text)
+    return "\n".join(chunks)
+
+
 def parse_excel(file_path: str) -> str:
     try:
-        wb = load_workbook(filename=file_path, data_only=True)
-        chunks: list[str] = []
-        for sheet in wb.worksheets:
-            chunks.append(f"## {sheet.title}")
-            for row in sheet.iter_rows(values_only=True):
-                row_text = " | ".join("" if value is None else str(value) for value in row)
-                if row_text.strip():
-                    chunks.append(row_text)
-        return "\n".join(chunks)
+        # Read-only worksheets stream rows from the zip archive independently,
+        # so sheets (e.g. an LV split by trade) can be rendered concurrently
+        wb = load_workbook(filename=file_path, data_only=True, read_only=True)
+        try:
+            sheets = wb.worksheets
+            if len(sheets) > 1:
+                with ThreadPoolExecutor(max_workers=min(8, len(sheets))) as executor:
+                    rendered = list(executor.map(_render_sheet, sheets))
+            else:
+                rendered = [_render_sheet(sheet) for sheet in sheets]
+        finally:
+            # Read-only workbooks keep the zip archive open until closed
+            wb.close()
+        return "\n".join(rendered)
     except Exception as exc:  # noqa: BLE001 - return consistent error types
         raise ParseError(f"Failed to parse Excel file: {file_path}") from exc
 
 
+def _parse_csv_arrow(file_path: str) -> str:
+    # Arrow needs the column count up front to read every column as a string
+    with open(file_path, "r", encoding="utf-8", errors="ignore", newline="") as handle:
+        column_count = len(next(csv.reader(handle), []))
+
+    table = pacsv.read_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(block_size=8 << 20, use_threads=True, autogenerate_column_names=True),
+        parse_options=pacsv.ParseOptions(delimiter=",", newlines_in_values=True),
+        # Keep cells as written (no numeric/date inference, empty cells stay "")
+        convert_options=pacsv.ConvertOptions(column_types={f"f{index}": pa.string() for index in range(column_count)}),
+    )
+    buffer = io.StringIO()
+    for batch in table.to_batches():
+        for row in zip(*(column.to_pylist() for column in batch.columns)):
+            row_text = " | ".join(row)
+            if row_text.strip():
+                buffer.write(row_text)
+                buffer.write("\n")
+    return buffer.getvalue().removesuffix("\n")
+
+
 def parse_csv(file_path: str) -> str:
     try:
-        chunks: list[str] = []
+        if _PYARROW_AVAILABLE and os.path.getsize(file_path) >= _ARROW_CSV_MIN_BYTES:
+            try:
+                return _parse_csv_arrow(file_path)
+            except Exception:  # noqa: BLE001 - ragged rows, bad encoding: use the tolerant parser
+                pass
+
+        # Write rows straight into one buffer instead of collecting a list of row strings
+        buffer = io.StringIO()
         with open(file_path, "r", encoding="utf-8", errors="ignore") as handle:
             reader = csv.reader(handle)
             for row in reader:
-                row_text = " | ".join(str(cell) for cell in row)
+                row_text = " | ".join(row)  # csv.reader already yields str cells
                 if row_text.strip():
-                    chunks.append(row_text)
-        return "\n".join(chunks)
+                    buffer.write(row_text)
+                    buffer.write("\n")
+        return buffer.getvalue().removesuffix("\n")
     except Exception as exc:  # noqa: BLE001 - return consistent error types
         raise ParseError(f"Failed to parse CSV file: {file_path}") from exc
 
@@ -122,10 +338,130 @@ def parse_text(file_path: str) -> str:
         raise ParseError(f"Failed to parse text file: {file_path}") from exc
 
 
-# GAEB PARSING DISABLED FOR PRODUCTION - Python 3.13 compatibility issues
-# def parse_gaeb(file_path: str) -> str:
-#     """Parse GAEB XML files (German tender exchange format) into normalized text."""
-#     raise ParseError("GAEB parsing is disabled in production due to Python 3.13 compatibility issues")
+class _GaebSaxHandler(xml.sax.ContentHandler):
+    """
+    Single-pass GAEB DA XML reader.
+
+    Only the current position (Item) is held in memory, so huge LVs parse in
+    constant memory without building a DOM. Element names are matched without
+    namespace prefixes, which differ between GAEB versions.
+    """
+
+    _ITEM_FIELDS = frozenset({"OZ", "Qty", "QU", "UP"})
+    # Free-text elements outside positions and the prefix of their output line
+    _TEXT_BLOCKS = {"LblTx": "###", "Remark": "Bemerkung:", "Note": "Hinweis:"}
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.blocks: list[list[str]] = []
+        self.positions = 0
+        self._path: list[str] = []
+        self._chars: list[str] = []
+        self._ctgy_numbers: list[str] = []  # RNoPart of enclosing BoQCtgy elements
+        self._item: dict[str, str] | None = None
+        self._item_text: list[str] = []
+        self._block_name: str | None = None
+        self._block_text: list[str] = []
+        self._in_item_block = False
+
+    def _add_block(self, line: str) -> None:
+        self.blocks.append([line])
+        self._in_item_block = False
+
+    def startElement(self, name, attrs):
+        name = name.rpartition(":")[2]
+        self._path.append(name)
+        self._chars = []
+        if name == "BoQCtgy":
+            self._ctgy_numbers.append(attrs.get("RNoPart", ""))
+        elif name == "Item":
+            self._item = {"RNoPart": attrs.get("RNoPart", "")}
+            self._item_text = []
+        elif name in self._TEXT_BLOCKS and self._item is None and self._block_name is None:
+            # Collected across nested markup (Text, p, span, ...)
+            self._block_name = name
+            self._block_text = []
+
+    def characters(self, content):
+        self._chars.append(content)
+        if self._item is not None and "DetailTxt" in self._path:
+            self._item_text.append(content)
+        elif self._block_name is not None:
+            self._block_text.append(content)
+
+    def endElement(self, name):
+        name = name.rpartition(":")[2]
+        self._path.pop()
+        text = " ".join("".join(self._chars).split())
+        self._chars = []
+
+        if self._item is not None:
+            if name in self._ITEM_FIELDS and text:
+                self._item[name] = text
+            elif name == "Item":
+                self._add_item(self._item)
+                self._item = None
+        elif name == "BoQTitle" and text:
+            self._add_block(f"Projekt: {text}")
+        elif name == "Name" and self._path and self._path[-1] == "BoQInfo" and text:
+            self._add_block(f"## {text}")
+        elif name == self._block_name:
+            block_text = " ".join("".join(self._block_text).split())
+            if block_text:
+                self._add_block(f"{self._TEXT_BLOCKS[name]} {block_text}")
+            self._block_name = None
+        elif name == "BoQCtgy" and self._ctgy_numbers:
+            self._ctgy_numbers.pop()
+
+    def _add_item(self, item: dict[str, str]) -> None:
+        # GAEB 3.x carries the OZ as RNoPart attributes along the category path
+        oz = item.get("OZ") or ".".join(
+            part for part in (*self._ctgy_numbers, item["RNoPart"]) if part
+        )
+        parts = [oz] if oz else []
+        description = " ".join("".join(self._item_text).split())
+        if description:
+            parts.append(description)
+        if "Qty" in item:
+            parts.append(f"Menge: {item['Qty']} {item.get('QU', '')}".rstrip())
+        if "UP" in item:
+            parts.append(f"Preis: {item['UP']}")
+        if not parts:
+            return
+        if not self._in_item_block:
+            self.blocks.append([])
+            self._in_item_block = True
+        self.blocks[-1].append(" | ".join(parts))
+        self.positions += 1
+
+
+def parse_gaeb(file_path: str) -> str:
+    """Parse GAEB XML files (German tender exchange format) into normalized text."""
+    handler = _GaebSaxHandler()
+    try:
+        if os.path.getsize(file_path) > 0:
+            xml.sax.parse(file_path, handler)
+    except Exception as exc:  # noqa: BLE001 - return consistent error types
+        raise ParseError(f"Failed to parse GAEB file: {file_path}") from exc
+
+    if not handler.blocks:
+        raise ParseError(f"GAEB file appears empty: {file_path}")
+
+    text = "\n\n".join(
+        ["=== GAEB LEISTUNGSVERZEICHNIS ==="] + ["\n".join(block) for block in handler.blocks]
+    )
+    logger.info("[Parser] Extracted %d characters from GAEB (%d positions)", len(text), handler.positions)
+    return text
+
+
+# Parsers that take only a path; PDF is dispatched separately for its OCR options
+_PARSERS: dict[str, Callable[[str], str]] = {
+    "word": parse_word,
+    "excel": parse_excel,
+    "csv": parse_csv,
+    "text": parse_text,
+    "gaeb": parse_gaeb,
+}
 
 
 def parse_file(
@@ -133,6 +469,11 @@ def parse_file(
     enable_ocr: bool = False,
     ocr_max_pages: int = 50,
     temp_file_path: str | None = None,
+    llm_cache: LLMCache | None = None,
+    content_hash: str | None = None,
+    ocr_max_workers: int | None = None,
+    ocr_dpi: int = 200,
+    enable_gaeb: bool = True,
 ) -> str:
     """
     Parse file based on type, with optional OCR for scanned PDFs.
@@ -142,27 +483,43 @@ def parse_file(
         enable_ocr: Enable OCR for scanned PDFs
         ocr_max_pages: Maximum pages to OCR
         temp_file_path: Temporary file path (if downloaded from R2)
+        llm_cache: Optional LLM result cache, consulted before any parsing
+        content_hash: SHA-256 of the file bytes (computed if omitted)
+        ocr_max_workers: Parallel OCR workers (defaults to the CPU count)
+        ocr_dpi: Render resolution for OCR page images
+        enable_gaeb: Parse GAEB files (GAEB_ENABLED)
         
     Returns:
         Extracted text content
+
+    Raises:
+        CacheHit: If llm_cache already holds an extraction for these file bytes
     """
     # Use temp file path if provided, otherwise use original path
-    actual_path = temp_file_path if temp_file_path else file_path
+    actual_path = temp_file_path or file_path
+
+    # Skip parsing entirely when the extraction for these exact bytes is cached
+    if llm_cache is not None:
+        content_hash = content_hash or compute_file_sha256(actual_path)
+        cached = llm_cache.get(content_hash)
+        if cached is not None:
+            raise CacheHit(content_hash, cached)
     
     file_type = get_file_type(file_path)
     
     if file_type == "pdf":
-        return parse_pdf(actual_path, enable_ocr=enable_ocr, ocr_max_pages=ocr_max_pages)
-    if file_type == "word":
-        return parse_word(actual_path)
-    if file_type == "excel":
-        return parse_excel(actual_path)
-    if file_type == "csv":
-        return parse_csv(actual_path)
-    if file_type == "text":
-        return parse_text(actual_path)
-    # GAEB PARSING DISABLED FOR PRODUCTION
-    # if file_type == "gaeb":
-    #     return parse_gaeb(actual_path)
-    
-    raise PermanentError(f"Unsupported file type: {file_path}")
+        return parse_pdf(
+            actual_path,
+            enable_ocr=enable_ocr,
+            ocr_max_pages=ocr_max_pages,
+            ocr_max_workers=ocr_max_workers,
+            ocr_dpi=ocr_dpi,
+        )
+
+    if file_type == "gaeb" and not enable_gaeb:
+        raise PermanentError(f"GAEB parsing is disabled (GAEB_ENABLED=false): {file_path}")
+
+    parser = _PARSERS.get(file_type)
+    if parser is None:
+        raise PermanentError(f"Unsupported file type: {file_path}")
+    return parser(actual_path)
@@ -1,24 +1,42 @@
 from __future__ import annotations
 
 import json
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from redis import Redis
+from redis.commands.core import Script
 from sqlalchemy import func, text
 
 from workers.config import load_config
 from workers.core.logging import setup_logger
 from workers.database import operations
-from workers.database.connection import get_session
-from workers.database.models import ProcessingJob
+from workers.database.connection import get_session, get_session_factory
+from workers.database.models import FileExtraction, ProcessingJob
 from workers.processing.aggregator import aggregate_batch
 from workers.processing.extractor import process_file
 
+# orjson is optional - stdlib json is used when it is not installed
+_ORJSON_AVAILABLE = False
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+
+def _dumps(payload: dict) -> str:
+    # The Redis client uses decode_responses=True, so payloads stay str
+    return orjson.dumps(payload).decode() if _ORJSON_AVAILABLE else json.dumps(payload)
+
 
 def _parse_job(raw: str) -> dict | None:
     try:
-        return json.loads(raw)
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(raw) if _ORJSON_AVAILABLE else json.loads(raw)
     except json.JSONDecodeError:
         return None
 
@@ -26,18 +44,18 @@ def _parse_job(raw: str) -> dict | None:
 def _maybe_finalize_batch(session, batch_id: str, logger, config, redis_client) -> None:
     logger.info(f"[QueueWorker] _maybe_finalize_batch CALLED for batch {batch_id}")
     
-    if operations.is_batch_already_processed(session, batch_id):
-        logger.info(f"[QueueWorker] Batch {batch_id} already processed, skipping finalization")
-        return
-
-    job = operations.get_batch_by_id(session, batch_id)
+    # Job row and status summary in one round trip
+    job, summary = operations.get_finalize_context(session, batch_id)
     if job is None:
         logger.warning(f"[QueueWorker] Batch not found: {batch_id}")
         return
+
+    if job.status in {ProcessingJob.STATUS_COMPLETED, ProcessingJob.STATUS_COMPLETED_WITH_ERRORS}:
+        logger.info(f"[QueueWorker] Batch {batch_id} already processed, skipping finalization")
+        return
     
     logger.info(f"[QueueWorker] Batch {batch_id} current status: {job.status}, total_files: {job.total_files}")
 
-    summary = operations.get_batch_status_summary(session, batch_id)
     if summary:
         logger.info(f"[QueueWorker] Got summary for batch {batch_id}: {summary}")
         try:
@@ -123,18 +141,23 @@ def _maybe_finalize_batch(session, batch_id: str, logger, config, redis_client)
         if counts["processing_files"] == 0:
             pending_doc_ids = operations.get_pending_doc_ids(session, batch_id)
             if pending_doc_ids:
-                for doc_id in pending_doc_ids:
-                    job = {
-                        "job_id": str(uuid.uuid4()),
+                enqueued_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                retry_delay_ms = int(config.retry_base_delay_seconds * 1000)
+                payloads = [
+                    _dumps({
+                        "job_id": uuid.uuid4().hex,
                         "type": "process_file",
                         "doc_id": doc_id,
                         "batch_id": batch_id,
                         "attempt": 0,
                         "max_attempts": config.max_retry_attempts,
-                        "retry_delay_ms": int(config.retry_base_delay_seconds * 1000),
-                        "enqueued_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                    }
-                    redis_client.lpush(config.redis_queue_key, json.dumps(job))
+                        "retry_delay_ms": retry_delay_ms,
+                        "enqueued_at": enqueued_at,
+                    })
+                    for doc_id in pending_doc_ids
+                ]
+                # LPUSH is variadic - enqueue every pending file in one round trip
+                redis_client.lpush(config.redis_queue_key, *payloads)
                 logger.warning(
                     f"[QueueWorker] Re-queued {len(pending_doc_ids)} pending files for batch {batch_id}"
                 )
@@ -181,23 +204,75 @@ def _maybe_finalize_batch(session, batch_id: str, logger, config, redis_client)
 def _schedule_retry(redis_client: Redis, delayed_key: str, job: dict, delay_seconds: float, logger) -> None:
     run_at = time.time() + delay_seconds
     job["retry_at"] = run_at
-    redis_client.zadd(delayed_key, {json.dumps(job): run_at})
+    redis_client.zadd(delayed_key, {_dumps(job): run_at})
     logger.warning(
         f"[QueueWorker] Scheduled retry for job {job.get('job_id')} in {delay_seconds:.1f}s"
     )
 
 
+# Move due jobs from the delayed zset back onto the queue atomically, in one round trip
+_DRAIN_DELAYED_LUA = """
+local jobs = redis.call('ZRANGEBYSCORE', KEYS[1], 0, ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(jobs) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('LPUSH', KEYS[2], job)
+end
+return #jobs
+"""
+
+
+@lru_cache(maxsize=None)
+def _drain_delayed_script(redis_client: Redis) -> Script:
+    return redis_client.register_script(_DRAIN_DELAYED_LUA)
+
+
 def _drain_delayed(redis_client: Redis, delayed_key: str, queue_key: str, logger, limit: int = 20) -> int:
-    now = time.time()
-    ready_jobs = redis_client.zrangebyscore(delayed_key, 0, now, start=0, num=limit)
-    if not ready_jobs:
-        return 0
-    for job_raw in ready_jobs:
-        redis_client.zrem(delayed_key, job_raw)
-        redis_client.lpush(queue_key, job_raw)
-    if ready_jobs:
-        logger.info(f"[QueueWorker] Moved {len(ready_jobs)} delayed jobs back to queue")
-    return len(ready_jobs)
+    moved = int(_drain_delayed_script(redis_client)(keys=[delayed_key, queue_key], args=[time.time(), limit]))
+    if moved:
+        logger.info(f"[QueueWorker] Moved {moved} delayed jobs back to queue")
+    return moved
+
+
+# Striped locks so two threads of this worker never finalize the same batch at once
+_FINALIZE_LOCKS = tuple(threading.Lock() for _ in range(64))
+
+
+def _finalize_lock(batch_id: str) -> threading.Lock:
+    return _FINALIZE_LOCKS[hash(batch_id) % len(_FINALIZE_LOCKS)]
+
+
+def _finalize_in_new_session(batch_id: str, logger, config, redis_client) -> None:
+    # Sessions are not thread-safe, so each batch gets its own (and its own commit)
+    try:
+        with _finalize_lock(batch_id), get_session(config) as session:
+            _maybe_finalize_batch(session, batch_id, logger, config, redis_client)
+            session.commit()
+    except Exception as e:
+        logger.error(f"[QueueWorker] Error finalizing batch {batch_id}: {e}")
+
+
+def _claim_finalize_check(redis_client: Redis, config, batch_id: str) -> bool:
+    """
+    Debounce per-file finalize checks: at most one runs per batch per
+    FINALIZE_DEBOUNCE_SECONDS. A skipped check is deferred instead of dropped,
+    so the batch's last file still gets finalized shortly after it completes.
+    """
+    if config.finalize_debounce_seconds <= 0:
+        return True
+    lock_key = f"{config.redis_queue_key}:finalize_lock:{batch_id}"
+    if redis_client.set(lock_key, "1", nx=True, px=int(config.finalize_debounce_seconds * 1000)):
+        return True
+    deferred_key = f"{config.redis_queue_key}:finalize_deferred"
+    redis_client.zadd(deferred_key, {batch_id: time.time() + config.finalize_debounce_seconds})
+    return False
+
+
+def _run_deferred_finalize_checks(redis_client: Redis, config, logger, limit: int = 20) -> None:
+    deferred_key = f"{config.redis_queue_key}:finalize_deferred"
+    for batch_id in redis_client.zrangebyscore(deferred_key, 0, time.time(), start=0, num=limit):
+        # Only the worker that removes the entry runs the check
+        if redis_client.zrem(deferred_key, batch_id):
+            _finalize_in_new_session(batch_id, logger, config, redis_client)
 
 
 def _check_stuck_batches(session, logger, config, redis_client) -> None:
@@ -232,37 +307,144 @@ def _check_stuck_batches(session, logger, config, redis_client) -> None:
         if result:
             logger.info(f"[QueueWorker] Found {len(result)} stuck batches to finalize")
             for row in result:
-                batch_id = row["batch_id"]
                 logger.warning(
-                    f"[QueueWorker] STUCK BATCH DETECTED: {batch_id} "
+                    f"[QueueWorker] STUCK BATCH DETECTED: {row['batch_id']} "
                     f"(success={row['files_success']}, failed={row['files_failed']}, "
                     f"total={row['total_files']}) - forcing finalization"
                 )
-                _maybe_finalize_batch(session, batch_id, logger, config, redis_client)
-                session.commit()  # Commit each batch separately
+            # Batches are independent, so finalize them concurrently
+            max_workers = min(config.stuck_finalize_concurrency, len(result))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for row in result:
+                    executor.submit(_finalize_in_new_session, row["batch_id"], logger, config, redis_client)
     except Exception as e:
         logger.error(f"[QueueWorker] Error checking stuck batches: {e}")
         session.rollback()
 
 
+def _handle_job(job: dict, config, redis_client: Redis, logger) -> None:
+    processing_key = f"{config.redis_queue_key}:processing"
+    delayed_key = f"{config.redis_queue_key}:delayed"
+    dead_key = f"{config.redis_queue_key}:dead"
+
+    job_type = job.get("type")
+    job_id = job.get("job_id") or "unknown"
+    redis_client.sadd(processing_key, job_id)
+    try:
+        if job_type == "process_file":
+            doc_id = job.get("doc_id")
+            batch_id = job.get("batch_id")
+            if not doc_id:
+                logger.error("[QueueWorker] Missing doc_id in job payload")
+                return
+
+            logger.info(f"[QueueWorker] Processing doc_id={doc_id}")
+            with get_session(config) as session:
+                result = process_file(session, doc_id, config)
+                if result.status == FileExtraction.STATUS_FAILED:
+                    retry_count = operations.increment_retry_count(session, doc_id)
+                    session.flush()
+                    if retry_count < config.max_retry_attempts:
+                        attempt = job.get("attempt", 0) + 1
+                        job["attempt"] = attempt
+                        delay_seconds = max(
+                            1.0,
+                            float(job.get("retry_delay_ms", 2000)) / 1000.0,
+                        )
+                        _schedule_retry(
+                            redis_client,
+                            delayed_key,
+                            job,
+                            delay_seconds,
+                            logger,
+                        )
+                    else:
+                        redis_client.rpush(dead_key, _dumps(job))
+                        logger.error(
+                            f"[QueueWorker] Job {job_id} exceeded max retries, moved to dead queue"
+                        )
+
+            # Checked only after this file's result is committed, so concurrent
+            # jobs for the same batch always see each other's results
+            effective_batch_id = batch_id or result.run_id
+            if effective_batch_id and _claim_finalize_check(redis_client, config, effective_batch_id):
+                _finalize_in_new_session(effective_batch_id, logger, config, redis_client)
+
+        elif job_type == "aggregate_batch":
+            batch_id = job.get("batch_id")
+            if not batch_id:
+                logger.error("[QueueWorker] Missing batch_id in job payload")
+                return
+            logger.info(f"[QueueWorker] Aggregating batch_id={batch_id}")
+            with get_session(config) as session:
+                try:
+                    aggregate_batch(session, batch_id, config)
+                except Exception as exc:  # noqa: BLE001
+                    attempt = job.get("attempt", 0) + 1
+                    if attempt < config.max_retry_attempts:
+                        job["attempt"] = attempt
+                        delay_seconds = max(
+                            1.0,
+                            float(job.get("retry_delay_ms", 2000)) / 1000.0,
+                        )
+                        _schedule_retry(
+                            redis_client,
+                            delayed_key,
+                            job,
+                            delay_seconds,
+                            logger,
+                        )
+                    else:
+                        redis_client.rpush(dead_key, _dumps(job))
+                        logger.error(
+                            f"[QueueWorker] Aggregate job {job_id} exceeded max retries"
+                        )
+                    raise exc
+
+        else:
+            logger.warning(f"[QueueWorker] Unknown job type: {job_type}")
+    finally:
+        redis_client.srem(processing_key, job_id)
+
+
+def _run_job(job: dict, config, redis_client: Redis, logger, slots: threading.Semaphore) -> None:
+    """Thread pool entry point: run one job and always free its slot."""
+    try:
+        _handle_job(job, config, redis_client, logger)
+    except Exception as exc:  # noqa: BLE001 - keep worker threads alive
+        logger.error(f"[QueueWorker] Error: {exc}")
+    finally:
+        slots.release()
+
+
 def main() -> None:
     config = load_config()
     logger = setup_logger("worker.queue", config)
+    # Create the engine and session factory before any job thread needs them
+    get_session_factory(config)
 
     redis_client = Redis.from_url(
         config.redis_url,
         decode_responses=True,
     )
-    processing_key = f"{config.redis_queue_key}:processing"
     delayed_key = f"{config.redis_queue_key}:delayed"
-    dead_key = f"{config.redis_queue_key}:dead"
 
     logger.info(f"[QueueWorker] Connected to Redis: {config.redis_url}")
     logger.info(f"[QueueWorker] Listening on queue: {config.redis_queue_key}")
+    logger.info(f"[QueueWorker] Concurrency: {config.worker_concurrency}")
 
     last_stuck_check = time.time()
     stuck_check_interval = 30  # Check every 30 seconds
 
+    # Jobs run on a small thread pool so one document can be parsed (CPU/OCR)
+    # while another waits on the LLM (network). A job is only popped from
+    # Redis once a slot is free, so nothing sits in memory waiting to start.
+    slots = threading.Semaphore(config.worker_concurrency)
+    executor = ThreadPoolExecutor(
+        max_workers=config.worker_concurrency,
+        thread_name_prefix="queue-job",
+    )
+
     while True:
         try:
             # Periodic stuck batch check (STATE-DRIVEN finalization)
@@ -274,98 +456,32 @@ def main() -> None:
                 last_stuck_check = now
             
             _drain_delayed(redis_client, delayed_key, config.redis_queue_key, logger)
+            _run_deferred_finalize_checks(redis_client, config, logger)
+
+            if not slots.acquire(timeout=5):
+                continue
 
-            job_data = redis_client.brpop(config.redis_queue_key, timeout=5)
+            try:
+                job_data = redis_client.brpop(config.redis_queue_key, timeout=5)
+            except Exception:
+                slots.release()
+                raise
             if not job_data:
+                slots.release()
                 continue
 
             _, raw = job_data
             job = _parse_job(raw)
             if not job:
+                slots.release()
                 logger.error("[QueueWorker] Invalid job payload (not JSON)")
                 continue
 
-            job_type = job.get("type")
-            job_id = job.get("job_id") or "unknown"
-            redis_client.sadd(processing_key, job_id)
-            try:
-                if job_type == "process_file":
-                    doc_id = job.get("doc_id")
-                    batch_id = job.get("batch_id")
-                    if not doc_id:
-                        logger.error("[QueueWorker] Missing doc_id in job payload")
-                        continue
-
-                    logger.info(f"[QueueWorker] Processing doc_id={doc_id}")
-                    with get_session(config) as session:
-                        process_file(session, doc_id, config)
-                        file_row = operations.get_file_by_doc_id(session, doc_id)
-                        if file_row and file_row.status == file_row.STATUS_FAILED:
-                            retry_count = operations.increment_retry_count(session, doc_id)
-                            session.flush()
-                            if retry_count < config.max_retry_attempts:
-                                attempt = job.get("attempt", 0) + 1
-                                job["attempt"] = attempt
-                                delay_seconds = max(
-                                    1.0,
-                                    float(job.get("retry_delay_ms", 2000)) / 1000.0,
-                                )
-                                _schedule_retry(
-                                    redis_client,
-                                    delayed_key,
-                                    job,
-                                    delay_seconds,
-                                    logger,
-                                )
-                            else:
-                                redis_client.rpush(dead_key, json.dumps(job))
-                                logger.error(
-                                    f"[QueueWorker] Job {job_id} exceeded max retries, moved to dead queue"
-                                )
-                        
-                        # Determine effective batch_id (handle run_id semantics)
-                        effective_batch_id = batch_id or (file_row.run_id if file_row else None)
-                        if effective_batch_id:
-                            _maybe_finalize_batch(session, effective_batch_id, logger, config, redis_client)
-
-                elif job_type == "aggregate_batch":
-                    batch_id = job.get("batch_id")
-                    if not batch_id:
-                        logger.error("[QueueWorker] Missing batch_id in job payload")
-                        continue
-                    logger.info(f"[QueueWorker] Aggregating batch_id={batch_id}")
-                    with get_session(config) as session:
-                        try:
-                            aggregate_batch(session, batch_id, config)
-                        except Exception as exc:  # noqa: BLE001
-                            attempt = job.get("attempt", 0) + 1
-                            if attempt < config.max_retry_attempts:
-                                job["attempt"] = attempt
-                                delay_seconds = max(
-                                    1.0,
-                                    float(job.get("retry_delay_ms", 2000)) / 1000.0,
-                                )
-                                _schedule_retry(
-                                    redis_client,
-                                    delayed_key,
-                                    job,
-                                    delay_seconds,
-                                    logger,
-                                )
-                            else:
-                                redis_client.rpush(dead_key, json.dumps(job))
-                                logger.error(
-                                    f"[QueueWorker] Aggregate job {job_id} exceeded max retries"
-                                )
-                            raise exc
-
-                else:
-                    logger.warning(f"[QueueWorker] Unknown job type: {job_type}")
-            finally:
-                redis_client.srem(processing_key, job_id)
+            executor.submit(_run_job, job, config, redis_client, logger, slots)
 
         except KeyboardInterrupt:
             logger.info("[QueueWorker] Shutting down...")
+            executor.shutdown(wait=True)
             break
         except Exception as exc:  # noqa: BLE001 - keep worker loop alive
             logger.error(f"[QueueWorker] Error: {exc}")
@@ -3,14 +3,61 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List, Union
+
+
+class ObjectKey:
+    """
+    Storage key whose normalized form is computed once.
+
+    Adapters accept an ObjectKey wherever they accept a str key; build one
+    when the same key is passed to the adapter repeatedly. It compares and
+    hashes like its raw string, so str-keyed caches still match.
+    """
+
+    __slots__ = ("raw", "normalized")
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        # Keys are relative to the storage root
+        self.normalized = raw.lstrip("/\\")
+
+    def __str__(self) -> str:
+        return self.raw
+
+    def __repr__(self) -> str:
+        return f"ObjectKey({self.raw!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ObjectKey):
+            return self.raw == other.raw
+        if isinstance(other, str):
+            return self.raw == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.raw)
+
+
+KeyLike = Union[str, ObjectKey]
+
+
+def normalize_key(object_key: KeyLike) -> str:
+    """Return the storage-root-relative form of a str or ObjectKey."""
+    if type(object_key) is ObjectKey:
+        return object_key.normalized
+    return object_key.lstrip("/\\")
 
 
 class StorageAdapter(ABC):
-    """Abstract interface for storage operations."""
+    """
+    Abstract interface for storage operations.
+
+    Every object_key parameter also accepts an ObjectKey.
+    """
 
     @abstractmethod
-    def read_file(self, object_key: str) -> bytes:
+    def read_file(self, object_key: str) -> Union[bytes, bytearray]:
         """
         Read file contents from storage.
         
@@ -18,7 +65,8 @@ class StorageAdapter(ABC):
             object_key: Storage key (e.g., "extracted/batch_123/doc.pdf")
             
         Returns:
-            File contents as bytes
+            File contents as bytes, or a bytearray where the adapter assembles
+            large objects in place (R2)
             
         Raises:
             PermanentError: If file not found or permission denied
@@ -26,6 +74,44 @@ class StorageAdapter(ABC):
         """
         pass
 
+    def bulk_read(self, object_keys: List[str]) -> Dict[str, Union[bytes, bytearray]]:
+        """
+        Read several files from storage.
+        
+        Adapters override this to overlap the reads; the default reads
+        one key at a time.
+        
+        Args:
+            object_keys: Storage keys
+            
+        Returns:
+            Mapping of object key to file contents
+            
+        Raises:
+            PermanentError: If a file is not found or permission denied
+            RetryableError: If temporary network/storage error
+        """
+        return {object_key: self.read_file(object_key) for object_key in object_keys}
+
+    def download_to_path(self, object_key: str, local_path: str) -> None:
+        """
+        Download file contents from storage into a local file.
+        
+        Adapters override this to stream instead of buffering the whole
+        file in memory; the default falls back to read_file.
+        
+        Args:
+            object_key: Storage key (e.g., "extracted/batch_123/doc.pdf")
+            local_path: Local file path to write (created or truncated)
+            
+        Raises:
+            PermanentError: If file not found or permission denied
+            RetryableError: If temporary network/storage error
+        """
+        content = self.read_file(object_key)
+        with open(local_path, "wb") as handle:
+            handle.write(content)
+
     @abstractmethod
     def write_file(self, object_key: str, content: bytes) -> None:
         """
@@ -45,6 +131,9 @@ class StorageAdapter(ABC):
     def file_exists(self, object_key: str) -> bool:
         """
         Check if file exists in storage.
+
+        Not needed as a guard before read_file: call read_file directly and
+        catch PermanentError, which saves a round-trip.
         
         Args:
             object_key: Storage key
@@ -84,6 +173,22 @@ class StorageAdapter(ABC):
         """
         pass
 
+    def delete_files(self, object_keys: List[str]) -> None:
+        """
+        Delete several files from storage.
+        
+        Adapters with a batch delete API override this; the default
+        deletes one key at a time.
+        
+        Args:
+            object_keys: Storage keys
+            
+        Raises:
+            RetryableError: If temporary error
+        """
+        for object_key in object_keys:
+            self.delete_file(object_key)
+
     @abstractmethod
     def delete_file(self, object_key: str) -> None:
         """
@@ -2,12 +2,57 @@
 
 from __future__ import annotations
 
+import errno
 import os
+import shutil
+import stat
+import sys
+import threading
 from pathlib import Path
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
 from workers.core.errors import PermanentError, RetryableError
-from workers.storage.adapter import StorageAdapter
+from workers.storage.adapter import KeyLike, StorageAdapter, normalize_key
+
+_COPY_BUFFER_SIZE = 1024 * 1024  # 1 MiB
+_BULK_READ_WORKERS = 8
+
+# Keys are resolved relative to an open fd on the base directory where supported,
+# so the kernel does not re-walk base_path on every call
+_DIR_FD_SUPPORTED = hasattr(os, "O_DIRECTORY") and {os.open, os.stat, os.unlink, os.replace} <= os.supports_dir_fd
+
+# Linux can sendfile() between regular files, copying inside the kernel
+_SENDFILE_AVAILABLE = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+
+def _sendfile(source, target) -> bool:
+    """Copy source to target with os.sendfile; False if unsupported (nothing written)."""
+    size = os.fstat(source.fileno()).st_size
+    offset = 0
+    try:
+        while offset < size:
+            sent = os.sendfile(target.fileno(), source.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except OSError as exc:
+        if offset == 0 and exc.errno in (errno.EINVAL, errno.ENOSYS):
+            return False
+        raise
+    return True
+
+
+def _hard_link(file_path: Path, local_path: str) -> bool:
+    """Replace local_path with a hard link to file_path; False if that is not possible."""
+    staging_path = f"{local_path}.link"
+    try:
+        os.link(file_path, staging_path)
+    except OSError:
+        # EXDEV (other filesystem), EPERM (no hard links), missing source, ...
+        return False
+    os.replace(staging_path, local_path)
+    return True
 
 
 class LocalStorageAdapter(StorageAdapter):
@@ -23,18 +68,36 @@ class LocalStorageAdapter(StorageAdapter):
         self.base_path = Path(base_path)
         if not self.base_path.exists():
             raise ValueError(f"Base path does not exist: {base_path}")
+        self._base_fd = (
+            os.open(self.base_path, os.O_RDONLY | os.O_DIRECTORY) if _DIR_FD_SUPPORTED else None
+        )
+
+    def close(self) -> None:
+        """Release the base directory fd."""
+        base_fd, self._base_fd = getattr(self, "_base_fd", None), None
+        if base_fd is not None:
+            os.close(base_fd)
 
-    def _resolve_path(self, object_key: str) -> Path:
+    def __del__(self) -> None:
+        self.close()
+
+    def _resolve_path(self, object_key: KeyLike) -> Path:
         """Convert object key to absolute filesystem path."""
-        # Remove leading slashes
-        clean_key = object_key.lstrip("/\\")
-        return self.base_path / clean_key
+        return self.base_path / normalize_key(object_key)
+
+    def _key_path(self, object_key: KeyLike) -> str:
+        """Path to pass to os calls together with dir_fd=self._base_fd."""
+        if self._base_fd is None:
+            return str(self._resolve_path(object_key))
+        return normalize_key(object_key)
+
+    def _open_key(self, object_key: KeyLike, flags: int) -> int:
+        return os.open(self._key_path(object_key), flags, 0o666, dir_fd=self._base_fd)
 
     def read_file(self, object_key: str) -> bytes:
         """Read file from local filesystem."""
-        file_path = self._resolve_path(object_key)
         try:
-            with open(file_path, "rb") as handle:
+            with open(self._open_key(object_key, os.O_RDONLY), "rb") as handle:
                 return handle.read()
         except FileNotFoundError as exc:
             raise PermanentError(f"File not found: {object_key}") from exc
@@ -43,14 +106,59 @@ class LocalStorageAdapter(StorageAdapter):
         except Exception as exc:
             raise RetryableError(f"Failed to read file: {object_key}") from exc
 
+    def bulk_read(self, object_keys: List[str]) -> Dict[str, bytes]:
+        """Read several files concurrently (file reads release the GIL)."""
+        if len(object_keys) <= 1:
+            return super().bulk_read(object_keys)
+        with ThreadPoolExecutor(max_workers=min(_BULK_READ_WORKERS, len(object_keys))) as executor:
+            return dict(zip(object_keys, executor.map(self.read_file, object_keys)))
+
+    def download_to_path(self, object_key: str, local_path: str) -> None:
+        """
+        Copy file from local storage to a local path without buffering it in Python.
+        
+        On the same filesystem local_path becomes a hard link sharing the stored
+        file's inode; write_file replaces files instead of truncating them, so a
+        later overwrite of object_key never changes a copy that is being parsed.
+        """
+        file_path = self._resolve_path(object_key)
+        if _hard_link(file_path, local_path):
+            return
+        try:
+            with open(file_path, "rb") as source, open(local_path, "wb") as target:
+                if not (_SENDFILE_AVAILABLE and _sendfile(source, target)):
+                    shutil.copyfileobj(source, target, _COPY_BUFFER_SIZE)
+        except FileNotFoundError as exc:
+            raise PermanentError(f"File not found: {object_key}") from exc
+        except PermissionError as exc:
+            raise PermanentError(f"Permission denied: {object_key}") from exc
+        except Exception as exc:
+            raise RetryableError(f"Failed to read file: {object_key}") from exc
+
     def write_file(self, object_key: str, content: bytes) -> None:
         """Write file to local filesystem."""
-        file_path = self._resolve_path(object_key)
+        # Write a sibling and rename it over the key: truncating in place would
+        # also change hard-linked copies handed out by download_to_path
+        key_path = self._key_path(object_key)
+        staging_path = f"{key_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
         try:
-            # Create parent directories
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(file_path, "wb") as handle:
-                handle.write(content)
+            try:
+                fd = os.open(staging_path, flags, 0o666, dir_fd=self._base_fd)
+            except FileNotFoundError:
+                # Create parent directories only when they are missing
+                self._resolve_path(object_key).parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(staging_path, flags, 0o666, dir_fd=self._base_fd)
+            try:
+                with open(fd, "wb") as handle:
+                    handle.write(content)
+                os.replace(staging_path, key_path, src_dir_fd=self._base_fd, dst_dir_fd=self._base_fd)
+            except BaseException:
+                try:
+                    os.unlink(staging_path, dir_fd=self._base_fd)
+                except OSError:
+                    pass
+                raise
         except PermissionError as exc:
             raise PermanentError(f"Permission denied: {object_key}") from exc
         except Exception as exc:
@@ -58,14 +166,16 @@ class LocalStorageAdapter(StorageAdapter):
 
     def file_exists(self, object_key: str) -> bool:
         """Check if file exists on local filesystem."""
-        file_path = self._resolve_path(object_key)
-        return file_path.exists() and file_path.is_file()
+        try:
+            info = os.stat(self._key_path(object_key), dir_fd=self._base_fd)
+        except OSError:
+            return False
+        return stat.S_ISREG(info.st_mode)
 
     def get_file_size(self, object_key: str) -> int:
         """Get file size from local filesystem."""
-        file_path = self._resolve_path(object_key)
         try:
-            return os.path.getsize(file_path)
+            return os.stat(self._key_path(object_key), dir_fd=self._base_fd).st_size
         except FileNotFoundError as exc:
             raise PermanentError(f"File not found: {object_key}") from exc
         except Exception as exc:
@@ -82,20 +192,26 @@ class LocalStorageAdapter(StorageAdapter):
             # Prefix is a file
             files.append(prefix)
         elif prefix_path.is_dir():
-            # Prefix is a directory - list all files recursively
-            for path in prefix_path.rglob("*"):
-                if path.is_file():
-                    # Convert back to relative key
-                    relative = path.relative_to(self.base_path)
-                    files.append(str(relative).replace("\\", "/"))
+            # Prefix is a directory - walk it with scandir, whose entries know
+            # their type without an extra stat(); keys are a slice of the path
+            base_len = len(os.path.join(str(self.base_path), ""))
+            stack = [str(prefix_path)]
+            while stack:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            files.append(entry.path[base_len:].replace(os.sep, "/"))
         
         return files
 
     def delete_file(self, object_key: str) -> None:
         """Delete file from local filesystem."""
-        file_path = self._resolve_path(object_key)
         try:
-            if file_path.exists():
-                file_path.unlink()
+            # unlink alone is enough: a missing file is already "deleted"
+            os.unlink(self._key_path(object_key), dir_fd=self._base_fd)
+        except FileNotFoundError:
+            pass
         except Exception as exc:
             raise RetryableError(f"Failed to delete file: {object_key}") from exc
@@ -2,19 +2,106 @@
 
 from __future__ import annotations
 
-from typing import List
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Union
 
-from workers.core.errors import PermanentError, RetryableError
-from workers.storage.adapter import StorageAdapter
+from workers.core.errors import PermanentError, RetryableError, WorkerError
+from workers.storage.adapter import KeyLike, StorageAdapter, normalize_key
 
 # boto3 is optional - only required when using R2
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
     from botocore.exceptions import ClientError, NoCredentialsError
     _BOTO3_AVAILABLE = True
 except ImportError:
     _BOTO3_AVAILABLE = False
 
+_MB = 1024 * 1024
+
+# Objects larger than one chunk are read as parallel byte ranges; more than
+# ~16 concurrent streams per process stops helping
+_RANGE_CHUNK_SIZE = 8 * _MB
+_RANGE_EXECUTOR = ThreadPoolExecutor(max_workers=10, thread_name_prefix="r2-range")
+# Ranges are copied into the object buffer in slices of this size
+_RANGE_READ_SIZE = 1 * _MB
+
+# Managed transfers (uploads and temp-file downloads) switch to concurrent
+# multipart above 16 MiB; R2 parts must be at least 5 MiB
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * _MB,
+    multipart_chunksize=16 * _MB,
+    max_concurrency=10,
+    use_threads=True,
+) if _BOTO3_AVAILABLE else None
+
+# Listings longer than one page fan out over the first level of "subdirectories"
+_LIST_PAGE_SIZE = 1000
+_LIST_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="r2-list")
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+_DELETE_BATCH_SIZE = 1000
+
+
+# S3 error codes that no retry can fix; anything else is treated as transient
+_ERROR_MAP = {
+    "404": (PermanentError, "File not found in R2"),
+    "NoSuchKey": (PermanentError, "File not found in R2"),
+    "403": (PermanentError, "Permission denied for R2"),
+    "AccessDenied": (PermanentError, "Permission denied for R2"),
+    "InvalidAccessKeyId": (PermanentError, "Permission denied for R2"),
+}
+
+
+def _error_code(exc: ClientError) -> str:
+    return exc.response.get("Error", {}).get("Code", "")
+
+
+def _client_error(exc: ClientError, object_key: str, retry_message: str) -> WorkerError:
+    """Map a botocore ClientError to the worker error for object_key."""
+    error_class, message = _ERROR_MAP.get(_error_code(exc), (RetryableError, retry_message))
+    return error_class(f"{message}: {object_key}")
+
+
+# Process-wide S3 clients, one per (account_id, access_key_id, secret, region)
+_CLIENTS: dict = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_client(account_id: str, access_key_id: str, secret_access_key: str, region: str):
+    """
+    Return the process-wide S3 client for an R2 account.
+    
+    botocore clients are thread-safe; creating one per adapter would pay a
+    fresh TCP/TLS handshake per connection and the default pool of 10
+    connections overflows under parallel range reads and job concurrency.
+    """
+    cache_key = (account_id, access_key_id, secret_access_key, region)
+    client = _CLIENTS.get(cache_key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(cache_key)
+            if client is None:
+                # Client creation is not thread-safe on boto3's shared default
+                # session, so each client gets its own Session
+                client = boto3.session.Session().client(
+                    "s3",
+                    endpoint_url=f"https://{account_id}.r2.cloudflarestorage.com",
+                    aws_access_key_id=access_key_id,
+                    aws_secret_access_key=secret_access_key,
+                    region_name=region,
+                    config=BotoConfig(
+                        max_pool_connections=64,
+                        retries={"max_attempts": 3, "mode": "adaptive"},
+                        tcp_keepalive=True,
+                    ),
+                )
+                _CLIENTS[cache_key] = client
+    return client
+
 
 class R2StorageAdapter(StorageAdapter):
     """Storage adapter for Cloudflare R2 (S3-compatible)."""
@@ -46,66 +133,107 @@ class R2StorageAdapter(StorageAdapter):
 
         self.bucket_name = bucket_name
         self.environment = environment
+        self._env_prefix = f"{environment}/"
         
-        # Construct R2 endpoint URL
-        endpoint_url = f"https://{account_id}.r2.cloudflarestorage.com"
-        
-        # Initialize S3 client with R2 endpoint
-        self.s3_client = boto3.client(
-            "s3",
-            endpoint_url=endpoint_url,
-            aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key,
-            region_name=region,
-        )
-
-    def _add_environment_prefix(self, object_key: str) -> str:
+        # Shared per credentials, so every adapter reuses the same connection pool
+        self.s3_client = _get_client(account_id, access_key_id, secret_access_key, region)
+
+    def _add_environment_prefix(self, object_key: KeyLike) -> str:
         """Add environment prefix to object key."""
-        # Remove leading slashes
-        clean_key = object_key.lstrip("/")
-        return f"{self.environment}/{clean_key}"
+        return self._env_prefix + normalize_key(object_key)
 
     def _remove_environment_prefix(self, full_key: str) -> str:
         """Remove environment prefix from object key."""
-        prefix = f"{self.environment}/"
-        if full_key.startswith(prefix):
-            return full_key[len(prefix):]
-        return full_key
+        return full_key.removeprefix(self._env_prefix)
+
+    def read_file(self, object_key: str) -> Union[bytes, bytearray]:
+        """Read file from R2 (objects above one range come back as a bytearray)."""
+        full_key = self._add_environment_prefix(object_key)
+        try:
+            # The first range doubles as the size probe, so small objects take one GET
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=full_key,
+                Range=f"bytes=0-{_RANGE_CHUNK_SIZE - 1}",
+            )
+            if "ContentRange" not in response:
+                # Range ignored: the body is the whole object
+                return response["Body"].read()
+            size = int(response["ContentRange"].rpartition("/")[2])
+            if size <= _RANGE_CHUNK_SIZE:
+                return response["Body"].read()
+            return self._read_ranges(full_key, size, response)
+        except ClientError as exc:
+            if _error_code(exc) == "InvalidRange":
+                # Every range of an empty object is unsatisfiable
+                return b""
+            raise _client_error(exc, object_key, "Failed to read from R2") from exc
+        except NoCredentialsError as exc:
+            raise PermanentError("R2 credentials not configured") from exc
+        except Exception as exc:
+            raise RetryableError(f"Failed to read from R2: {object_key}") from exc
+
+    def _read_ranges(self, full_key: str, size: int, first_response: dict) -> bytearray:
+        """Fetch the rest of a large object as concurrent byte-range GETs into one buffer."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        etag = first_response["ETag"]
 
-    def read_file(self, object_key: str) -> bytes:
-        """Read file from R2."""
+        def fill(body, start: int, end: int) -> None:
+            # readinto writes straight into the buffer; read(n) is the fallback
+            # for bodies without it, bounded so peak memory stays at one buffer
+            readinto = getattr(body, "readinto", None)
+            while start < end:
+                if readinto is not None:
+                    count = readinto(view[start:min(end, start + _RANGE_READ_SIZE)])
+                else:
+                    chunk = body.read(min(_RANGE_READ_SIZE, end - start))
+                    count = len(chunk)
+                    view[start:start + count] = chunk
+                if not count:
+                    raise RetryableError(f"Truncated range read from R2: {full_key}")
+                start += count
+
+        def fetch(start: int) -> None:
+            end = min(start + _RANGE_CHUNK_SIZE, size)
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=full_key,
+                Range=f"bytes={start}-{end - 1}",
+                IfMatch=etag,  # Fail instead of mixing parts of two object versions
+            )
+            fill(response["Body"], start, end)
+
+        fill(first_response["Body"], 0, _RANGE_CHUNK_SIZE)
+        # list() re-raises the first failed range
+        list(_RANGE_EXECUTOR.map(fetch, range(_RANGE_CHUNK_SIZE, size, _RANGE_CHUNK_SIZE)))
+        # Returned as-is: bytes(buffer) would copy the whole object again
+        return buffer
+
+    def download_to_path(self, object_key: str, local_path: str) -> None:
+        """Stream file from R2 straight to a local path (no in-memory copy)."""
         full_key = self._add_environment_prefix(object_key)
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=full_key)
-            return response["Body"].read()
+            with open(local_path, "wb") as handle:
+                self.s3_client.download_fileobj(
+                    self.bucket_name, full_key, handle, Config=_TRANSFER_CONFIG
+                )
         except ClientError as exc:
-            error_code = exc.response.get("Error", {}).get("Code", "")
-            if error_code == "NoSuchKey":
-                raise PermanentError(f"File not found in R2: {object_key}") from exc
-            elif error_code in ("AccessDenied", "InvalidAccessKeyId"):
-                raise PermanentError(f"Permission denied for R2: {object_key}") from exc
-            else:
-                raise RetryableError(f"Failed to read from R2: {object_key}") from exc
+            raise _client_error(exc, object_key, "Failed to read from R2") from exc
         except NoCredentialsError as exc:
             raise PermanentError("R2 credentials not configured") from exc
         except Exception as exc:
             raise RetryableError(f"Failed to read from R2: {object_key}") from exc
 
     def write_file(self, object_key: str, content: bytes) -> None:
-        """Write file to R2."""
+        """Write file to R2 (large files are uploaded as concurrent multipart parts)."""
         full_key = self._add_environment_prefix(object_key)
         try:
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=full_key,
-                Body=content,
+            self.s3_client.upload_fileobj(
+                io.BytesIO(content), self.bucket_name, full_key, Config=_TRANSFER_CONFIG
             )
         except ClientError as exc:
-            error_code = exc.response.get("Error", {}).get("Code", "")
-            if error_code in ("AccessDenied", "InvalidAccessKeyId"):
-                raise PermanentError(f"Permission denied for R2: {object_key}") from exc
-            else:
-                raise RetryableError(f"Failed to write to R2: {object_key}") from exc
+            raise _client_error(exc, object_key, "Failed to write to R2") from exc
         except NoCredentialsError as exc:
             raise PermanentError("R2 credentials not configured") from exc
         except Exception as exc:
@@ -117,12 +245,6 @@ class R2StorageAdapter(StorageAdapter):
         try:
             self.s3_client.head_object(Bucket=self.bucket_name, Key=full_key)
             return True
-        except ClientError as exc:
-            error_code = exc.response.get("Error", {}).get("Code", "")
-            if error_code in ("404", "NoSuchKey"):
-                return False
-            # Other errors are treated as "unknown"
-            return False
         except Exception:
             return False
 
@@ -133,11 +255,7 @@ class R2StorageAdapter(StorageAdapter):
             response = self.s3_client.head_object(Bucket=self.bucket_name, Key=full_key)
             return response["ContentLength"]
         except ClientError as exc:
-            error_code = exc.response.get("Error", {}).get("Code", "")
-            if error_code in ("404", "NoSuchKey"):
-                raise PermanentError(f"File not found in R2: {object_key}") from exc
-            else:
-                raise RetryableError(f"Failed to get file size from R2: {object_key}") from exc
+            raise _client_error(exc, object_key, "Failed to get file size from R2") from exc
         except Exception as exc:
             raise RetryableError(f"Failed to get file size from R2: {object_key}") from exc
 
@@ -145,21 +263,73 @@ class R2StorageAdapter(StorageAdapter):
         """List files with given prefix in R2."""
         full_prefix = self._add_environment_prefix(prefix)
         try:
-            files = []
-            paginator = self.s3_client.get_paginator("list_objects_v2")
-            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=full_prefix):
-                for obj in page.get("Contents", []):
-                    # Remove environment prefix from returned keys
-                    key = self._remove_environment_prefix(obj["Key"])
-                    files.append(key)
-            return files
+            page = self.s3_client.list_objects_v2(
+                Bucket=self.bucket_name, Prefix=full_prefix, MaxKeys=_LIST_PAGE_SIZE
+            )
+            full_keys = [obj["Key"] for obj in page.get("Contents", [])]
+            if page.get("IsTruncated"):
+                full_keys = self._list_remaining(full_prefix)
+            # Remove environment prefix from returned keys
+            return [self._remove_environment_prefix(key) for key in full_keys]
         except Exception as exc:
             raise RetryableError(f"Failed to list files in R2: {prefix}") from exc
 
+    def _list_remaining(self, full_prefix: str) -> List[str]:
+        """
+        List a prefix whose keys span several pages.
+
+        Continuation tokens make one listing strictly serial, so when the
+        prefix has several "/" sub-prefixes each subtree is paged in parallel.
+        Otherwise the keys at this level plus the one subtree are all there is.
+        """
+        level_keys, sub_prefixes = self._list_level(full_prefix)
+        if len(sub_prefixes) > 1:
+            full_keys = level_keys
+            for subtree in _LIST_EXECUTOR.map(self._list_all, sub_prefixes):
+                full_keys.extend(subtree)
+        else:
+            full_keys = level_keys + (self._list_all(sub_prefixes[0]) if sub_prefixes else [])
+        full_keys.sort()  # Same order as a single listing
+        return full_keys
+
+    def _list_level(self, full_prefix: str) -> Tuple[List[str], List[str]]:
+        """Keys directly under full_prefix, plus its "/"-delimited sub-prefixes."""
+        keys: List[str] = []
+        sub_prefixes: List[str] = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=full_prefix, Delimiter="/"):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+            sub_prefixes.extend(entry["Prefix"] for entry in page.get("CommonPrefixes", []))
+        return keys, sub_prefixes
+
+    def _list_all(self, full_prefix: str) -> List[str]:
+        """Every key under full_prefix."""
+        keys: List[str] = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.bucket_name, Prefix=full_prefix, PaginationConfig={"PageSize": _LIST_PAGE_SIZE}
+        ):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return keys
+
     def delete_file(self, object_key: str) -> None:
         """Delete file from R2."""
-        full_key = self._add_environment_prefix(object_key)
-        try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=full_key)
-        except Exception as exc:
-            raise RetryableError(f"Failed to delete file from R2: {object_key}") from exc
+        self.delete_files([object_key])
+
+    def delete_files(self, object_keys: List[str]) -> None:
+        """Delete files from R2 with multi-object deletes (up to 1000 keys per request)."""
+        failed: List[str] = []
+        for start in range(0, len(object_keys), _DELETE_BATCH_SIZE):
+            batch = object_keys[start:start + _DELETE_BATCH_SIZE]
+            full_keys = {self._add_environment_prefix(key): key for key in batch}
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": full_key} for full_key in full_keys], "Quiet": True},
+                )
+            except Exception as exc:
+                raise RetryableError(f"Failed to delete files from R2: {', '.join(map(str, batch))}") from exc
+            # Quiet mode only reports the keys that could not be deleted
+            failed.extend(full_keys.get(error["Key"], error["Key"]) for error in response.get("Errors", []))
+        if failed:
+            raise RetryableError(f"Failed to delete files from R2: {', '.join(map(str, failed))}")
@@ -5,26 +5,28 @@ from __future__ import annotations
 import os
 import tempfile
 from contextlib import contextmanager
-from pathlib import Path
 from typing import Generator
 
-from workers.storage.adapter import StorageAdapter
+from workers.storage.adapter import KeyLike, StorageAdapter
+from workers.utils.filesystem import get_file_extension
 
 
 class TempFileManager:
     """Manages temporary files for parsers that require filesystem paths."""
 
-    def __init__(self, storage: StorageAdapter):
+    def __init__(self, storage: StorageAdapter, temp_dir: str | None = None):
         """
         Initialize temp file manager.
         
         Args:
             storage: Storage adapter to download files from
+            temp_dir: Directory for temp files (default: system temp dir)
         """
         self.storage = storage
+        self.temp_dir = temp_dir
 
     @contextmanager
-    def download_to_temp(self, object_key: str, suffix: str = "") -> Generator[str, None, None]:
+    def download_to_temp(self, object_key: KeyLike, suffix: str = "") -> Generator[str, None, None]:
         """
         Download file from storage to temporary local file.
         
@@ -51,16 +53,16 @@ class TempFileManager:
         
         try:
             # Create temporary file with appropriate suffix
-            temp_fd, temp_path = tempfile.mkstemp(suffix=suffix)
+            if self.temp_dir:
+                os.makedirs(self.temp_dir, exist_ok=True)
+            temp_fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=self.temp_dir)
             
-            # Download file from storage
-            content = self.storage.read_file(object_key)
-            
-            # Write to temp file
-            os.write(temp_fd, content)
             os.close(temp_fd)
             temp_fd = None  # Mark as closed
             
+            # Stream file from storage into the temp file
+            self.storage.download_to_path(object_key, temp_path)
+            
             # Yield path for use
             yield temp_path
             
@@ -78,7 +80,7 @@ class TempFileManager:
                 except Exception:
                     pass  # Best effort cleanup
 
-    def get_file_extension(self, object_key: str) -> str:
+    def get_file_extension(self, object_key: KeyLike) -> str:
         """
         Extract file extension from object key.
         
@@ -88,4 +90,4 @@ class TempFileManager:
         Returns:
             File extension including dot (e.g., ".pdf")
         """
-        return Path(object_key).suffix.lower()
+        return get_file_extension(str(object_key))
@@ -39,3 +39,10 @@ def test_classify_error_messages():
     assert classify_error(RuntimeError("file not found")) == "PERMANENT"
     assert classify_error(RuntimeError("network connection error")) == "RETRYABLE"
     assert classify_error(RuntimeError("unknown")) == "UNKNOWN"
+
+
+def test_classify_error_message_priority():
+    # Earlier categories win regardless of where the keyword appears
+    assert classify_error(RuntimeError("connection timeout")) == "TIMEOUT"
+    assert classify_error(RuntimeError("Network error: HTTP 429")) == "RATE_LIMIT"
+    assert classify_error(RuntimeError("LLM response could not be decoded")) == "PARSE_ERROR"
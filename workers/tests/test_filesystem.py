@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from workers.utils.filesystem import get_file_extension, get_file_type, list_files_in_directory
+
+
+def test_get_file_extension_matches_path_suffix():
+    keys = [
+        "extracted/batch_1/doc.PDF",
+        "extracted/batch_1/archive.tar.gz",
+        "extracted/batch.1/README",
+        "extracted/.env",
+        "extracted/name.",
+        "plain",
+        "a..x83",
+    ]
+    for key in keys:
+        assert get_file_extension(key) == Path(key).suffix.lower(), key
+
+
+def test_get_file_type():
+    assert get_file_type("uploads/Angebot.X83") == "gaeb"
+    assert get_file_type("uploads/sheet.xlsx") == "excel"
+    assert get_file_type("uploads/noext") == "unknown"
+
+
+def test_list_files_recursive_matches_glob(tmp_path):
+    for relative in ["top.pdf", "top.txt", "a/one.pdf", "a/b/two.PDF", "a/b/c/three.pdf", "d/four.txt"]:
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+    (tmp_path / "empty").mkdir()
+
+    for pattern in ["**/*", "**/*.pdf"]:
+        expected = sorted(str(path) for path in tmp_path.glob(pattern) if path.is_file())
+        assert sorted(list_files_in_directory(str(tmp_path), pattern)) == expected
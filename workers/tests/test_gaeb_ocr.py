@@ -9,7 +9,7 @@ from pathlib import Path
 import pytest
 
 from workers.processing.parsers import parse_file, parse_gaeb, parse_pdf
-from workers.core.errors import ParseError
+from workers.core.errors import ParseError, PermanentError
 
 
 # Test fixtures directory
@@ -102,6 +102,25 @@ def test_parse_file_routing_pdf_with_ocr():
     assert isinstance(text, str)
 
 
+def test_gaeb_sax_parser_formats_positions():
+    """GAEB positions are rendered as 'OZ | Text | Menge | Preis' lines."""
+    text = parse_file(str(FIXTURES_DIR / "sample_gaeb.x83"))
+
+    assert text.startswith("=== GAEB LEISTUNGSVERZEICHNIS ===")
+    assert "Projekt: Neubau Bürogebäude - Leistungsverzeichnis" in text
+    assert "## Leistungsverzeichnis Rohbau" in text
+    assert "### Erdarbeiten\n\n01.01.010 | Oberboden abtragen" in text
+    assert "01.01.020 | Baugrube ausheben, Tiefe bis 3 m | Menge: 850 m³ | Preis: 18.75" in text
+    assert "### Betonarbeiten\n\n02.01.010 |" in text
+    assert "Bemerkung: Betongüte nach Statik prüfen" in text
+    assert text.endswith("Hinweis: Alle Preise verstehen sich netto. Ausführungsfrist: 6 Monate.")
+
+
+def test_gaeb_disabled_is_permanent_error():
+    with pytest.raises(PermanentError):
+        parse_file(str(FIXTURES_DIR / "sample_gaeb.x83"), enable_gaeb=False)
+
+
 if __name__ == "__main__":
     # Manual test runner
     print("Running GAEB/OCR parser tests...")
@@ -0,0 +1,55 @@
+import pytest
+
+from workers.core.errors import LLMError
+from workers.processing.llm_client import (
+    _parse_llm_response,
+    _truncate_to_token_budget,
+    extract_tender_data_dedup,
+)
+
+
+def test_parse_llm_response_plain_json():
+    assert _parse_llm_response('{"meta": {"tender_id": "A-1"}}') == {"meta": {"tender_id": "A-1"}}
+
+
+def test_parse_llm_response_wrapped_json():
+    response = 'Here is the result:\n```json\n{"risks": [{"risk_de": "x"}]}\n```\nSee {notes}.'
+    assert _parse_llm_response(response) == {"risks": [{"risk_de": "x"}]}
+
+
+def test_parse_llm_response_invalid():
+    with pytest.raises(LLMError):
+        _parse_llm_response("no json here")
+    with pytest.raises(LLMError):
+        _parse_llm_response("broken { json")
+
+
+def test_truncate_to_token_budget_keeps_head_and_tail(monkeypatch):
+    monkeypatch.setattr("workers.processing.llm_client._get_encoding", lambda _model: None)
+    text = "HEAD" + ("x" * 10_000) + "TAIL"
+    truncated = _truncate_to_token_budget(text, "gpt-4o", budget=100)
+    assert truncated.startswith("HEAD")
+    assert truncated.endswith("TAIL")
+    assert len(truncated) < len(text)
+
+
+def test_truncate_to_token_budget_short_text_untouched():
+    assert _truncate_to_token_budget("kurzer Text", "gpt-4o", budget=100) == "kurzer Text"
+
+
+def test_extract_tender_data_dedup_calls_llm_once_per_text(monkeypatch):
+    calls = []
+
+    def fake_extract(text, config, source_filename="document"):
+        calls.append((text, source_filename))
+        return {"meta": {"source_document": source_filename}, "risks": [{"source_document": source_filename}]}
+
+    monkeypatch.setattr("workers.processing.llm_client.extract_tender_data", fake_extract)
+
+    items = [("AGB text", "a.pdf"), ("other", "b.pdf"), ("AGB text", "c.pdf")]
+    results = extract_tender_data_dedup(items, config=None)
+
+    assert calls == [("AGB text", "a.pdf"), ("other", "b.pdf")]
+    assert results[0]["risks"][0]["source_document"] == "a.pdf"
+    assert results[2]["meta"]["source_document"] == "c.pdf"
+    assert results[2]["risks"][0]["source_document"] == "c.pdf"
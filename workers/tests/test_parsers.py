@@ -1,8 +1,13 @@
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import PyPDF2
 import pytest
 
 from workers.core.errors import PermanentError
+from workers.processing import parsers
+from workers.processing.llm_cache import CacheHit
 from workers.processing.parsers import parse_file
 
 
@@ -10,3 +15,109 @@ def test_parse_file_unsupported_type():
     with tempfile.NamedTemporaryFile(suffix=".txt") as handle:
         with pytest.raises(PermanentError):
             parse_file(handle.name)
+
+
+class _FakeCache:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get(self, content_hash):
+        return self.entries.get(content_hash)
+
+
+def test_parse_file_cache_hit_skips_parsing():
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as handle:
+        # Not a valid PDF - a cache hit must short-circuit before parsing
+        cache = _FakeCache({"abc": {"meta": {}}})
+        with pytest.raises(CacheHit) as hit:
+            parse_file(handle.name, llm_cache=cache, content_hash="abc")
+        assert hit.value.content_hash == "abc"
+        assert hit.value.extraction == {"meta": {}}
+
+
+def _write_blank_pdf(path, pages):
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    with open(path, "wb") as handle:
+        writer.write(handle)
+
+
+def test_parse_pdf_ocrs_only_empty_pages_in_order(monkeypatch, tmp_path):
+    pdf_path = tmp_path / "scan.pdf"
+    _write_blank_pdf(pdf_path, pages=3)
+    requested = []
+
+    def fake_convert(_path, dpi, first_page, last_page):
+        requested.append((first_page, last_page))
+        return list(range(first_page, last_page + 1))
+
+    monkeypatch.setattr(parsers, "_OCR_AVAILABLE", True)
+    monkeypatch.setattr(parsers, "convert_from_path", fake_convert, raising=False)
+    monkeypatch.setattr(parsers, "_ocr_pdf_page", lambda page: f"Seite {page} " + "x" * 60)
+
+    text = parsers.parse_pdf(str(pdf_path), enable_ocr=True, ocr_max_pages=2)
+
+    assert requested == [(1, 2)]
+    pages = text.split(parsers.OCR_PAGE_BREAK)
+    assert pages[0].startswith("Seite 1")
+    assert pages[1].startswith("Seite 2")
+    assert pages[2] == ""
+
+
+def test_parse_pdf_serializes_pdfium_across_threads(monkeypatch, tmp_path):
+    pytest.importorskip("pypdfium2")
+    monkeypatch.setattr(parsers, "_PDFIUM_AVAILABLE", True)
+    paths = []
+    for name in ("a.pdf", "b.pdf"):
+        paths.append(str(tmp_path / name))
+        _write_blank_pdf(paths[-1], pages=3)
+
+    active = []
+    overlaps = []
+    page_text = parsers._pdfium_page_text
+
+    def tracked_page_text(pdf, index):
+        active.append(index)
+        overlaps.append(len(active) > 1)
+        time.sleep(0.01)
+        active.pop()
+        return page_text(pdf, index)
+
+    monkeypatch.setattr(parsers, "_pdfium_page_text", tracked_page_text)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        texts = list(executor.map(parsers.parse_pdf, paths))
+
+    assert texts == ["\n\n", "\n\n"]
+    assert len(overlaps) == 6 and not any(overlaps)
+
+
+def test_page_runs_splits_on_gaps_and_batch_size():
+    assert parsers._page_runs([0, 1, 2, 5, 6], max_run_length=8) == [(1, 3), (6, 7)]
+    assert parsers._page_runs([0, 1, 2, 3, 4], max_run_length=2) == [(1, 2), (3, 4), (5, 5)]
+
+
+def test_extract_page_texts_skips_pages_of_scanned_documents():
+    extracted = []
+
+    def extract(index):
+        extracted.append(index)
+        return ""
+
+    page_texts, skipped = parsers._extract_page_texts(12, extract, ocr_enabled=True, ocr_max_pages=8)
+
+    assert extracted == [0, 1, 2, 3, 4, 8, 9, 10, 11]
+    assert skipped == [5, 6, 7]
+    assert len(page_texts) == 12
+
+
+def test_parse_csv_arrow_matches_stdlib(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    csv_path = tmp_path / "lv.csv"
+    csv_path.write_text('oz,text,menge\n007,"Beton\nC25/30",1.50\n,,\n', encoding="utf-8")
+
+    monkeypatch.setattr(parsers, "_ARROW_CSV_MIN_BYTES", 0)
+    arrow_text = parsers.parse_csv(str(csv_path))
+    monkeypatch.setattr(parsers, "_PYARROW_AVAILABLE", False)
+
+    assert arrow_text == parsers.parse_csv(str(csv_path))
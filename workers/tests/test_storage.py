@@ -0,0 +1,274 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from workers.storage import LocalStorageAdapter, ObjectKey
+
+
+def test_local_exists_and_size_follow_write_and_delete(tmp_path):
+    storage = LocalStorageAdapter(str(tmp_path))
+    assert storage.file_exists("docs/a.txt") is False
+
+    storage.write_file("docs/a.txt", b"abc")
+    assert storage.file_exists("docs/a.txt") is True
+    assert storage.get_file_size("docs/a.txt") == 3
+
+    storage.delete_file("docs/a.txt")
+    assert storage.file_exists("docs/a.txt") is False
+
+
+def test_local_list_files_walks_prefix_recursively(tmp_path):
+    storage = LocalStorageAdapter(str(tmp_path))
+    for key in ("batch/a.pdf", "batch/sub/b.docx", "batch/sub/deeper/c.x83", "other/d.txt"):
+        storage.write_file(key, b"x")
+
+    assert sorted(storage.list_files("batch/")) == [
+        "batch/a.pdf",
+        "batch/sub/b.docx",
+        "batch/sub/deeper/c.x83",
+    ]
+    assert storage.list_files("batch/a.pdf") == ["batch/a.pdf"]
+    assert storage.list_files("missing/") == []
+
+
+def test_local_bulk_read_returns_contents_by_key(tmp_path):
+    storage = LocalStorageAdapter(str(tmp_path))
+    contents = {f"batch/{index}.txt": f"doc {index}".encode() for index in range(5)}
+    for key, data in contents.items():
+        storage.write_file(key, data)
+
+    assert storage.bulk_read(list(contents)) == contents
+
+
+def test_local_delete_missing_file_is_noop(tmp_path):
+    adapter = LocalStorageAdapter(str(tmp_path))
+    adapter.write_file("a.txt", b"x")
+
+    adapter.delete_file("a.txt")
+    adapter.delete_file("a.txt")
+
+    assert not adapter.file_exists("a.txt")
+
+
+def test_object_key_matches_plain_str_key(tmp_path):
+    adapter = LocalStorageAdapter(str(tmp_path))
+    key = ObjectKey("/docs/a.txt")
+    adapter.write_file(key, b"abc")
+
+    assert adapter.read_file("docs/a.txt") == b"abc"
+    assert adapter.get_file_size(key) == 3
+    assert key == "/docs/a.txt" and hash(key) == hash("/docs/a.txt")
+
+
+def test_local_adapter_without_dir_fd(tmp_path, monkeypatch):
+    monkeypatch.setattr("workers.storage.local_adapter._DIR_FD_SUPPORTED", False)
+    adapter = LocalStorageAdapter(str(tmp_path))
+    adapter.write_file("nested/dir/a.txt", b"abc")
+
+    assert adapter.read_file("/nested/dir/a.txt") == b"abc"
+    assert adapter.get_file_size("nested/dir/a.txt") == 3
+    adapter.delete_file("nested/dir/a.txt")
+    assert not (tmp_path / "nested" / "dir" / "a.txt").exists()
+
+
+
+def test_local_download_hard_links_and_survives_overwrite(tmp_path):
+    adapter = LocalStorageAdapter(str(tmp_path))
+    adapter.write_file("uploads/a.pdf", b"original")
+    local_path = tmp_path / "copy.pdf"
+    adapter.download_to_path("uploads/a.pdf", str(local_path))
+
+    assert local_path.stat().st_ino == (tmp_path / "uploads" / "a.pdf").stat().st_ino
+    adapter.write_file("uploads/a.pdf", b"new")
+    assert local_path.read_bytes() == b"original"
+    assert adapter.read_file("uploads/a.pdf") == b"new"
+
+
+def test_local_download_copies_when_hard_link_fails(tmp_path, monkeypatch):
+    def refuse_link(*args, **kwargs):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr("workers.storage.local_adapter.os.link", refuse_link)
+    adapter = LocalStorageAdapter(str(tmp_path))
+    adapter.write_file("uploads/a.pdf", b"x" * 3000)
+    local_path = tmp_path / "copy.pdf"
+    local_path.write_bytes(b"stale content that is longer than the upload" * 100)
+    for sendfile_available in (True, False):
+        monkeypatch.setattr("workers.storage.local_adapter._SENDFILE_AVAILABLE", sendfile_available)
+        adapter.download_to_path("uploads/a.pdf", str(local_path))
+
+        assert local_path.read_bytes() == b"x" * 3000
+        assert local_path.stat().st_ino != (tmp_path / "uploads" / "a.pdf").stat().st_ino
+
+class _StubBody:
+    """StreamingBody without readinto, as in botocore < 1.39."""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def read(self, amt=None):
+        return self._stream.read(amt)
+
+
+class _StubReadintoBody(_StubBody):
+    def read(self, amt=None):
+        raise AssertionError("read() used although readinto() is available")
+
+    def readinto(self, buffer):
+        return self._stream.readinto(buffer)
+
+
+class _StubS3Client:
+    def __init__(self, data: bytes, body_class=_StubBody):
+        self.data = data
+        self.body_class = body_class
+        self.ranges = []
+
+    def delete_objects(self, Bucket, Delete):
+        if self.data is None:
+            raise ConnectionError("connection reset")
+        return {"Errors": [{"Key": obj["Key"], "Code": "InternalError"} for obj in Delete["Objects"]]}
+
+    def get_object(self, Bucket, Key, Range, IfMatch=None):
+        start, end = (int(part) for part in Range.removeprefix("bytes=").split("-"))
+        self.ranges.append((start, end))
+        body = self.data[start:end + 1]
+        return {
+            "Body": self.body_class(body),
+            "ContentRange": f"bytes {start}-{start + len(body) - 1}/{len(self.data)}",
+            "ETag": '"etag"',
+        }
+
+
+def test_r2_read_file_fetches_ranges_from_first_response(monkeypatch):
+    pytest.importorskip("boto3")
+    from workers.storage import r2_adapter
+
+    monkeypatch.setattr(r2_adapter, "_RANGE_CHUNK_SIZE", 4)
+    monkeypatch.setattr(r2_adapter, "_RANGE_READ_SIZE", 3)
+    adapter = object.__new__(r2_adapter.R2StorageAdapter)
+    adapter.bucket_name = "bucket"
+    adapter._env_prefix = "test/"
+    for body_class in (_StubBody, _StubReadintoBody):
+        adapter.s3_client = _StubS3Client(b"0123456789", body_class)
+        assert adapter.read_file("doc.pdf") == b"0123456789"
+        assert sorted(adapter.s3_client.ranges) == [(0, 3), (4, 7), (8, 9)]
+
+    adapter.s3_client = _StubS3Client(b"abc")
+    assert adapter.read_file("small.txt") == b"abc"
+    assert adapter.s3_client.ranges == [(0, 3)]
+
+
+def test_r2_delete_reports_object_keys(monkeypatch):
+    pytest.importorskip("boto3")
+    from workers.core.errors import RetryableError
+    from workers.storage import r2_adapter
+
+    adapter = object.__new__(r2_adapter.R2StorageAdapter)
+    adapter.bucket_name = "bucket"
+    adapter._env_prefix = "test/"
+    for data in (b"", None):  # Per-key errors, then a failed request
+        adapter.s3_client = _StubS3Client(data)
+        with pytest.raises(RetryableError, match="docs/a.pdf"):
+            adapter.delete_file(ObjectKey("docs/a.pdf"))
+
+
+def test_temp_file_manager_extension_accepts_object_key(tmp_path):
+    from workers.storage.temp_file_manager import TempFileManager
+
+    manager = TempFileManager(LocalStorageAdapter(str(tmp_path)))
+    assert manager.get_file_extension(ObjectKey("docs/Plan.PDF")) == ".pdf"
+    assert manager.get_file_extension("docs/x.d83") == ".d83"
+
+
+class _StubListClient:
+    """list_objects_v2 over a sorted key list; continuation tokens are list offsets."""
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.requests = []
+
+    def list_objects_v2(self, Bucket, Prefix, MaxKeys=1000, Delimiter=None, ContinuationToken=None):
+        self.requests.append((Prefix, Delimiter))
+        entries = []
+        for key in self.keys:
+            if not key.startswith(Prefix):
+                continue
+            cut = key.find(Delimiter, len(Prefix)) if Delimiter else -1
+            entry = ("prefix", key[:cut + 1]) if cut >= 0 else ("key", key)
+            if entry not in entries:
+                entries.append(entry)
+        start = int(ContinuationToken or 0)
+        page_entries = entries[start:start + MaxKeys]
+        page = {
+            "Contents": [{"Key": value} for kind, value in page_entries if kind == "key"],
+            "CommonPrefixes": [{"Prefix": value} for kind, value in page_entries if kind == "prefix"],
+            "IsTruncated": start + MaxKeys < len(entries),
+        }
+        if page["IsTruncated"]:
+            page["NextContinuationToken"] = str(start + MaxKeys)
+        return page
+
+    def get_paginator(self, operation):
+        client = self
+
+        class _Paginator:
+            def paginate(self, PaginationConfig=None, **request):
+                if PaginationConfig:
+                    request["MaxKeys"] = PaginationConfig["PageSize"]
+                while True:
+                    page = client.list_objects_v2(**request)
+                    yield page
+                    if not page["IsTruncated"]:
+                        return
+                    request["ContinuationToken"] = page["NextContinuationToken"]
+
+        return _Paginator()
+
+
+@pytest.mark.parametrize(
+    "keys, subtree_listings",
+    [
+        (["a.txt", "b.txt", "c.txt", "d/1", "d/2"], ["test/d/"]),
+        (["a.txt", "b.txt", "c.txt", "d.txt", "e.txt"], []),
+        (["a.txt", "d/1", "d/2", "e/1", "f/g/1"], ["test/d/", "test/e/", "test/f/"]),
+    ],
+)
+def test_r2_list_files_spanning_pages(monkeypatch, keys, subtree_listings):
+    pytest.importorskip("boto3")
+    from workers.storage import r2_adapter
+
+    monkeypatch.setattr(r2_adapter, "_LIST_PAGE_SIZE", 2)
+    adapter = object.__new__(r2_adapter.R2StorageAdapter)
+    adapter.bucket_name = "bucket"
+    adapter._env_prefix = "test/"
+    adapter.s3_client = _StubListClient([f"test/{key}" for key in keys] + ["other/x"])
+
+    assert adapter.list_files("") == sorted(keys)
+    full_listings = [prefix for prefix, delimiter in adapter.s3_client.requests if delimiter is None]
+    # The first page, then each sub-prefix once; the top level is never re-listed in full
+    assert full_listings.count("test/") == 1
+    assert sorted(set(full_listings) - {"test/"}) == subtree_listings
+
+
+def test_r2_client_is_created_once_under_concurrency(monkeypatch):
+    pytest.importorskip("boto3")
+    from workers.storage import r2_adapter
+
+    created = []
+
+    class _StubSession:
+        def client(self, *args, **kwargs):
+            time.sleep(0.01)  # Widen the race window
+            created.append(kwargs["endpoint_url"])
+            return object()
+
+    monkeypatch.setattr(r2_adapter, "_CLIENTS", {})
+    monkeypatch.setattr(r2_adapter.boto3.session, "Session", _StubSession)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: r2_adapter._get_client("acc", "k", "s", "auto"), range(8)))
+
+    assert len(created) == 1
+    assert all(client is clients[0] for client in clients)
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import fnmatch
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
+from types import MappingProxyType
 from typing import Iterable
 
 from workers.core.errors import PermanentError, RetryableError
@@ -16,36 +22,42 @@ def ensure_directory_exists(path: str) -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
 
 
+_EXT_TYPES = MappingProxyType({
+    ".pdf": "pdf",
+    ".doc": "word",
+    ".docx": "word",
+    ".xls": "excel",
+    ".xlsx": "excel",
+    ".zip": "zip",
+    ".txt": "text",
+    ".csv": "csv",
+})
+
+# GAEB formats (German tender exchange format)
+_GAEB_EXTS = frozenset({
+    ".x83", ".x84", ".x85", ".x86", ".x89",
+    ".d83", ".d84", ".d85", ".d86", ".d89",
+    ".p83", ".p84", ".p85", ".p86", ".p89",
+    ".gaeb",
+})
+
+
+@lru_cache(maxsize=4096)
+def get_file_extension(file_path: str) -> str:
+    """Lower-cased extension including the dot, following Path.suffix rules."""
+    name_start = max(file_path.rfind("/"), file_path.rfind("\\")) + 1
+    dot = file_path.rfind(".")
+    # No dot in the name, a dotfile like ".env", or a trailing dot
+    if dot <= name_start or dot == len(file_path) - 1:
+        return ""
+    return file_path[dot:].lower()
+
+
 def get_file_type(file_path: str) -> str:
-    ext = Path(file_path).suffix.lower()
-    mapping = {
-        ".pdf": "pdf",
-        ".doc": "word",
-        ".docx": "word",
-        ".xls": "excel",
-        ".xlsx": "excel",
-        ".zip": "zip",
-        ".txt": "text",
-        ".csv": "csv",
-        # GAEB formats (German tender exchange format)
-        ".x83": "gaeb",
-        ".x84": "gaeb",
-        ".x85": "gaeb",
-        ".x86": "gaeb",
-        ".x89": "gaeb",
-        ".d83": "gaeb",
-        ".d84": "gaeb",
-        ".d85": "gaeb",
-        ".d86": "gaeb",
-        ".d89": "gaeb",
-        ".p83": "gaeb",
-        ".p84": "gaeb",
-        ".p85": "gaeb",
-        ".p86": "gaeb",
-        ".p89": "gaeb",
-        ".gaeb": "gaeb",
-    }
-    return mapping.get(ext, "unknown")
+    ext = get_file_extension(file_path)
+    if ext in _GAEB_EXTS:
+        return "gaeb"
+    return _EXT_TYPES.get(ext, "unknown")
 
 
 def safe_read_file(file_path: str) -> bytes:
@@ -80,8 +92,61 @@ def get_file_size(file_path: str) -> int:
         raise RetryableError(f"Failed to get file size: {file_path}") from exc
 
 
+def compute_file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as handle:
+            for block in iter(lambda: handle.read(chunk_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except FileNotFoundError as exc:
+        raise PermanentError(f"File not found: {file_path}") from exc
+    except Exception as exc:  # noqa: BLE001 - keep retry behavior simple
+        raise RetryableError(f"Failed to hash file: {file_path}") from exc
+
+
 def list_files_in_directory(directory_path: str, pattern: str = "*") -> list[str]:
     directory = Path(directory_path)
     if not directory.exists():
         raise PermanentError(f"Directory not found: {directory_path}")
+    name_pattern = pattern[3:]
+    if pattern.startswith("**/") and "/" not in name_pattern and "**" not in name_pattern:
+        return _list_files_recursive(str(directory), name_pattern)
     return [str(path) for path in directory.glob(pattern) if path.is_file()]
+
+
+# More concurrent directory scans stop helping, even on network storage
+_LIST_MAX_WORKERS = min(16, os.cpu_count() or 1)
+
+
+def _list_files_recursive(top: str, name_pattern: str) -> list[str]:
+    """Equivalent of glob("**/<name_pattern>") with one scan per top-level subdirectory in parallel."""
+    files, subdirs = _scan_directory(top, name_pattern)
+    if subdirs:
+        with ThreadPoolExecutor(max_workers=min(_LIST_MAX_WORKERS, len(subdirs))) as executor:
+            for subtree in executor.map(_scan_tree, subdirs, repeat(name_pattern)):
+                files.extend(subtree)
+    return files
+
+
+def _scan_directory(path: str, name_pattern: str) -> tuple[list[str], list[str]]:
+    files: list[str] = []
+    subdirs: list[str] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            # Like glob's "**", symlinked directories are not descended into
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file() and fnmatch.fnmatch(entry.name, name_pattern):
+                files.append(entry.path)
+    return files, subdirs
+
+
+def _scan_tree(top: str, name_pattern: str) -> list[str]:
+    files: list[str] = []
+    pending = [top]
+    while pending:
+        found, subdirs = _scan_directory(pending.pop(), name_pattern)
+        files.extend(found)
+        pending.extend(subdirs)
+    return files